@@ -2,6 +2,7 @@ import os
 import pandas as pd
 import sqlalchemy
 from dotenv import load_dotenv
+from openpyxl import Workbook
 from sqlalchemy import text
 
 # Load environment variables
@@ -9,7 +10,7 @@ load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 EXPORT_PATH = os.getenv("EXPORT_PATH", ".")
 # Optional: specify schemas to include, or omit to include all non-system schemas
-SCHEMAS = os.getenv("SCHEMAS", "public").split(",")  # e.g. "public,analytics"
+SCHEMAS = [s.strip() for s in os.getenv("SCHEMAS", "public").split(",") if s.strip()]  # e.g. "public,analytics"
 
 # Ensure export path exists
 os.makedirs(EXPORT_PATH, exist_ok=True)
@@ -18,23 +19,28 @@ os.makedirs(EXPORT_PATH, exist_ok=True)
 engine = sqlalchemy.create_engine(DATABASE_URL)
 
 # Query table and column metadata
-query_metadata = f"""
+query_metadata = """
     SELECT
         table_schema,
         table_name,
         column_name,
         data_type
     FROM information_schema.columns
-    WHERE table_schema IN ({', '.join(f"'{s}'" for s in SCHEMAS)})
+    WHERE table_schema = ANY(:schemas)
     ORDER BY table_schema, table_name, ordinal_position;
 """
 
 # Fetch metadata into DataFrame
 with engine.connect() as conn:
-    metadata_df = pd.read_sql_query(text(query_metadata), con=conn)
+    metadata_df = pd.read_sql_query(text(query_metadata), con=conn, params={"schemas": SCHEMAS})
 
-# Write metadata to Excel
+# Write metadata to Excel (write_only streams rows instead of building every Cell in memory)
 output_file = os.path.join(EXPORT_PATH, "schema_metadata.xlsx")
-metadata_df.to_excel(output_file, index=False, sheet_name="columns_and_types")
+wb = Workbook(write_only=True)
+ws = wb.create_sheet("columns_and_types")
+ws.append(list(metadata_df.columns))
+for row in metadata_df.itertuples(index=False, name=None):
+    ws.append(row)
+wb.save(output_file)
 
 print(f"✅ Schema metadata written to: {output_file}")
@@ -2,13 +2,14 @@ import os
 import pandas as pd
 import sqlalchemy
 from dotenv import load_dotenv
+from openpyxl import Workbook
 from sqlalchemy import text
 
 # Load environment variables
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 EXPORT_PATH = os.getenv("EXPORT_PATH", ".")
-SCHEMAS = os.getenv("SCHEMAS", "public").split(",")  # e.g. "public,analytics"
+SCHEMAS = [s.strip() for s in os.getenv("SCHEMAS", "public").split(",") if s.strip()]  # e.g. "public,analytics"
 
 # Ensure export path exists
 os.makedirs(EXPORT_PATH, exist_ok=True)
@@ -17,25 +18,40 @@ os.makedirs(EXPORT_PATH, exist_ok=True)
 engine = sqlalchemy.create_engine(DATABASE_URL)
 
 # Fetch column metadata
-query_metadata = f"""
+query_metadata = """
     SELECT
         table_schema,
         table_name,
         column_name,
         data_type
     FROM information_schema.columns
-    WHERE table_schema IN ({', '.join(f"'{s.strip()}'" for s in SCHEMAS)})
+    WHERE table_schema = ANY(:schemas)
     ORDER BY table_schema, table_name, ordinal_position;
 """
 
-metadata_df = pd.read_sql_query(text(query_metadata), con=engine)
+metadata_df = pd.read_sql_query(text(query_metadata), con=engine, params={"schemas": SCHEMAS})
 
 # Write each table's metadata to its own sheet
+# (write_only streams rows instead of building every Cell in memory)
 output_file = os.path.join(EXPORT_PATH, "schema_metadata_by_table.xlsx")
-with pd.ExcelWriter(output_file, engine="openpyxl") as writer:
-    for (schema, table), group in metadata_df.groupby(['table_schema', 'table_name']):
+wb = Workbook(write_only=True)
+# One pass over rows sorted by table (stable, so columns keep ordinal_position);
+# a new sheet starts whenever (schema, table) changes
+metadata_df = metadata_df.sort_values(['table_schema', 'table_name'], kind='stable')
+current = None
+for schema, table, column_name, data_type in metadata_df[
+    ['table_schema', 'table_name', 'column_name', 'data_type']
+].itertuples(index=False, name=None):
+    if (schema, table) != current:
+        if current is not None:
+            print(f"✅ Wrote metadata for: {current[0]}.{current[1]}")
+        current = (schema, table)
         sheet_name = f"{schema}.{table}"[:31]  # Excel sheet name limit
-        group[['column_name', 'data_type']].to_excel(writer, sheet_name=sheet_name, index=False)
-        print(f"✅ Wrote metadata for: {schema}.{table}")
+        ws = wb.create_sheet(sheet_name)
+        ws.append(['column_name', 'data_type'])
+    ws.append((column_name, data_type))
+if current is not None:
+    print(f"✅ Wrote metadata for: {current[0]}.{current[1]}")
+wb.save(output_file)
 
 print(f"✅ Finished exporting schema metadata to: {output_file}")
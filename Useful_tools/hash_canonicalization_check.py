@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+hash_canonicalization_check.py
+
+Runs calculate_hash_vectorized from excel_postgres_integration_V4.1_For_large_datasets.py
+on an Arrow-backed boolean column containing a null and checks that it hashes the
+same as the numpy-nullable boolean column the loader produced before pyarrow.
+
+Usage (PowerShell):
+  python .\hash_canonicalization_check.py
+
+Exit codes:
+ 0 - success
+ 1 - hashing failed or the two backends disagree
+ 2 - pyarrow not installed
+"""
+
+import importlib.util
+import os
+import sys
+
+import pandas as pd
+
+LOADER_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    os.pardir,
+    "excel_postgres_integration_V4.1_For_large_datasets.py",
+)
+
+
+def load_loader():
+    # the file name contains dots, so it cannot be imported by name
+    spec = importlib.util.spec_from_file_location("large_datasets_loader", LOADER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print('ERROR: pyarrow is not installed; nothing to check.')
+        sys.exit(2)
+
+    loader = load_loader()
+    df = pd.DataFrame({'flag': [True, False, None]})
+    arrow_df = df.convert_dtypes(dtype_backend='pyarrow')
+    numpy_df = df.convert_dtypes(dtype_backend='numpy_nullable')
+
+    try:
+        canonical = loader.canonicalize_vectorized(arrow_df['flag']).tolist()
+        arrow_hashes = loader.calculate_hash_vectorized(arrow_df, ['flag']).tolist()
+        numpy_hashes = loader.calculate_hash_vectorized(numpy_df, ['flag']).tolist()
+    except Exception as e:
+        print('Hash check: FAILED')
+        print('Unexpected error:', e)
+        sys.exit(1)
+
+    if canonical != ['1', '0', ''] or arrow_hashes != numpy_hashes:
+        print('Hash check: FAILED')
+        print(f"{arrow_df['flag'].dtype} canonicalized to {canonical}")
+        print('Hashes differ between dtype backends')
+        sys.exit(1)
+
+    print('Hash check: SUCCESS')
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
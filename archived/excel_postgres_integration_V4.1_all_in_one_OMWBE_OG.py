@@ -51,18 +51,16 @@ The script ensures that your PostgreSQL database stays in sync with your Excel d
 while preserving referential integrity and providing comprehensive logging.
 
 '''
+import io
 import os
 import sys
 import logging
-import hashlib
 import time
-from datetime import datetime
 from dotenv import load_dotenv
 
 import pandas as pd
 import sqlalchemy
 from sqlalchemy import text, MetaData, Table, inspect
-from sqlalchemy.dialects.postgresql import insert
 
 # ── Configure Logging ──────────────────────────────────────────────────────────
 logging.basicConfig(
@@ -80,12 +78,6 @@ CONFLICT_KEYS = {
 
 
 
-def calculate_row_hash(row, data_cols):
-    """Concatenate and hash all relevant fields for change detection."""
-    concat = "|".join(str(row[c]) for c in data_cols)
-    return hashlib.md5(concat.encode("utf-8")).hexdigest()
-
-
 def process_sheet(engine, sheet_name, df, schema_name):
     start_time = time.time()
     logger.info(f"▶ Processing sheet '{sheet_name}'")
@@ -107,10 +99,12 @@ def process_sheet(engine, sheet_name, df, schema_name):
     # 4) Compute row_hash for change detection
     immutable = ('created_at', 'updated_at', 'row_hash')
     data_cols = [c for c in df.columns if c not in immutable]
-    df['row_hash'] = df.apply(lambda r: calculate_row_hash(r, data_cols), axis=1)
+    # vectorized 64-bit hash over the column buffers (stored as BIGINT)
+    hashes = pd.util.hash_pandas_object(df[data_cols], index=False)
+    df['row_hash'] = hashes.to_numpy().view('int64')
 
-    # 5) Stamp updated_at
-    df['updated_at'] = datetime.now()
+    # 5) updated_at is stamped by Postgres (column DEFAULT on insert, now() on update)
+    df = df.drop(columns='updated_at', errors='ignore')
 
     # 6) Warn on duplicate hashes
     dup = df['row_hash'].duplicated().sum()
@@ -145,9 +139,26 @@ def process_sheet(engine, sheet_name, df, schema_name):
             ALTER TABLE {schema_name}.{sheet_name}
               ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
               ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ,
-              ADD COLUMN IF NOT EXISTS row_hash TEXT;
+              ADD COLUMN IF NOT EXISTS row_hash BIGINT;
             ALTER TABLE {schema_name}.{sheet_name}
-              ALTER COLUMN updated_at DROP DEFAULT;
+              ALTER COLUMN updated_at SET DEFAULT now();
+        """))
+
+        # 9a) Migrate a legacy TEXT (md5 hex) row_hash to BIGINT; rows rehash on this run
+        conn.execute(text(f"""
+            DO $$ BEGIN
+              IF EXISTS (
+                SELECT 1
+                  FROM information_schema.columns
+                 WHERE table_schema = '{schema_name}'
+                   AND table_name = '{sheet_name}'
+                   AND column_name = 'row_hash'
+                   AND data_type <> 'bigint'
+              ) THEN
+                ALTER TABLE {schema_name}.{sheet_name}
+                  ALTER COLUMN row_hash TYPE BIGINT USING NULL;
+              END IF;
+            END $$;
         """))
 
         # 10) Ensure UNIQUE on conflict keys
@@ -172,33 +183,70 @@ def process_sheet(engine, sheet_name, df, schema_name):
         meta.clear()
         table = Table(sheet_name, meta, autoload_with=conn, schema=schema_name)
 
-        # 12) Prepare and execute UPSERT
-        records = df.to_dict(orient='records')
-        stmt = insert(table).values(records)
-        update_cols = {
-            c.name: stmt.excluded[c.name]
-            for c in table.columns
-            if c.name not in (*keys, 'created_at')
-        }
-        update_cols['updated_at'] = text('now()')
+        # 12) Stage incoming rows with COPY for a single INSERT ... SELECT upsert
+        # (NaN/NaT/NA are written as NULL by the CSV writer)
+        quote = conn.dialect.identifier_preparer.quote
+        target = f"{schema_name}.{sheet_name}"
+        stage = f"stg_{sheet_name}"
+        cols = ", ".join(quote(c) for c in df.columns)
+        conn.execute(text(f"""
+            CREATE TEMP TABLE {stage}
+              (LIKE {target} INCLUDING DEFAULTS)
+              ON COMMIT DROP
+        """))
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {stage} ({cols}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                io.StringIO(df.to_csv(index=False, header=False, na_rep='\\N'))
+            )
+        finally:
+            cursor.close()
 
-        
         # Use ON CONFLICT to update only if row_hash has change
-        upsert = stmt.on_conflict_do_update(
-            index_elements=keys,
-            set_=update_cols,
-            where=(table.c.row_hash != stmt.excluded.row_hash)
-            
+        set_list = ",\n              ".join(
+            f"{quote(c.name)} = EXCLUDED.{quote(c.name)}"
+            for c in table.columns
+            if c.name not in (*keys, 'created_at', 'updated_at')
         )
-        # 13) Delete stale rows no longer in source
-        incoming_hashes = tuple(df['row_hash'].unique())
-        if incoming_hashes:  # avoid deleting everything if input is empty
-            delete_stmt = text(f"""
-                DELETE FROM {schema_name}.{sheet_name}
-                WHERE row_hash IS NOT NULL
-                  AND row_hash NOT IN :hashes
-            """).bindparams(hashes=incoming_hashes)
-            deleted = conn.execute(delete_stmt).rowcount
+        upsert = text(f"""
+            INSERT INTO {target} AS t ({cols})
+            SELECT {cols} FROM {stage}
+            ON CONFLICT ({", ".join(quote(k) for k in keys)}) DO UPDATE
+              SET {set_list},
+              updated_at = now()
+            WHERE t.row_hash IS DISTINCT FROM EXCLUDED.row_hash
+        """)
+
+        # 13) Delete stale rows no longer in source: COPY the incoming hashes into
+        # a temp table and anti-join, instead of binding an N-item NOT IN list
+        incoming_hashes = df['row_hash'].drop_duplicates()
+        if not incoming_hashes.empty:  # avoid deleting everything if input is empty
+            conn.execute(text(
+                "CREATE TEMP TABLE _incoming_hashes (row_hash BIGINT PRIMARY KEY) ON COMMIT DROP"
+            ))
+            cursor = conn.connection.cursor()
+            try:
+                cursor.copy_expert(
+                    "COPY _incoming_hashes (row_hash) FROM STDIN",
+                    io.StringIO(incoming_hashes.to_csv(index=False, header=False))
+                )
+            finally:
+                cursor.close()
+            # A NULL row_hash (nulled by the 9a migration) is matched on the conflict
+            # keys instead: stale unless the stage holds a row with the same keys
+            key_match = " AND ".join(f"s.{quote(k)} = t.{quote(k)}" for k in keys)
+            deleted = conn.execute(text(f"""
+                DELETE FROM {schema_name}.{sheet_name} t
+                WHERE (t.row_hash IS NOT NULL
+                       AND NOT EXISTS (
+                         SELECT 1 FROM _incoming_hashes i WHERE i.row_hash = t.row_hash
+                       ))
+                   OR (t.row_hash IS NULL
+                       AND NOT EXISTS (
+                         SELECT 1 FROM {stage} s WHERE {key_match}
+                       ))
+            """)).rowcount
             logger.info(f"🗑️ Deleted {deleted} stale rows from '{sheet_name}'")
 
 
@@ -1,15 +1,17 @@
+import io
 import os
 import sys
 import logging
-import hashlib
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, date
 from dotenv import load_dotenv
 
 import pandas as pd
 import sqlalchemy
-from sqlalchemy import text, MetaData, Table, inspect
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import text, MetaData
+from psycopg2 import sql
+from psycopg2.extras import execute_values
 
 # ── Configure Logging ──────────────────────────────────────────────────────────
 logging.basicConfig(
@@ -24,6 +26,50 @@ CONFLICT_KEYS = {
     "vendor_search_results": ["uniqueid", "b2gnow_vendor_number"]
 }
 
+# ── Sheets larger than this go through COPY into a temp stage ──────────────────
+COPY_THRESHOLD = 1024
+COPY_CHUNK_ROWS = 50_000        # rows per COPY buffer (bounds peak memory)
+
+# ── Sheets write to independent tables; process up to this many at once ────────
+MAX_WORKERS = 8
+
+# ── Excel reader: Rust-backed calamine when installed, openpyxl otherwise ──────
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
+# ── Quote identifiers/literals with psycopg2.sql instead of raw f-strings ──────
+def _ident(conn, *parts):
+    """Quoted (optionally schema-qualified) identifier, e.g. "public"."sheet"."""
+    return sql.Identifier(*parts).as_string(conn.connection.dbapi_connection)
+
+def _lit(conn, value):
+    """Quoted SQL literal for values embedded in DDL / DO blocks."""
+    return sql.Literal(value).as_string(conn.connection.dbapi_connection)
+
+# ── COPY a frame into a table through the raw DBAPI cursor ─────────────────────
+def _copy_frame(conn, df, table_name, chunk_rows=COPY_CHUNK_ROWS):
+    """Stream df into table_name (already quoted) with COPY, chunk_rows at a time
+    so the CSV buffer stays bounded (still one transaction; a failure rolls back all)."""
+    columns = ", ".join(_ident(conn, c) for c in df.columns)
+    copy_sql = (
+        f"COPY {table_name} ({columns}) "
+        f"FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    )
+    cursor = conn.connection.cursor()
+    try:
+        for i in range(0, len(df), chunk_rows):
+            buf = io.BytesIO()
+            df.iloc[i:i + chunk_rows].to_csv(
+                buf, index=False, header=False, na_rep='\\N', encoding='utf-8'
+            )
+            buf.seek(0)
+            cursor.copy_expert(copy_sql, buf)
+    finally:
+        cursor.close()
+
 # ── Canonicalizer for stable hashing across runs ───────────────────────────────
 def _canon(v):
     """Canonicalize values so blanks/dates/numbers hash the same across runs."""
@@ -41,24 +87,55 @@ def _canon(v):
         return f"{v:.10g}"                # stable float formatting
     return str(v).strip()                 # trim strings
 
-def process_sheet(engine, sheet_name, df, schema_name):
+def _canon_frame(df):
+    """Column-wise _canon: typed columns are normalized with vectorized ops."""
+    norm = pd.DataFrame(index=df.index)
+    for c in df.columns:
+        s = df[c]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            norm[c] = s.dt.strftime("%Y-%m-%dT%H:%M:%S").fillna("")
+        elif pd.api.types.is_float_dtype(s):
+            norm[c] = s.map(lambda x: format(x, ".10g"), na_action='ignore').astype("string").fillna("")
+        elif pd.api.types.is_object_dtype(s):
+            norm[c] = s.map(_canon)       # mixed python objects keep the scalar rules
+        else:
+            norm[c] = s.astype("string").str.strip().fillna("")
+    return norm
+
+# ── Catalog checks: reflect once per run, skip DDL a table no longer needs ──────
+def reflect_tables(engine, schema_name, table_names):
+    """Reflect the target tables in one catalog pass; tables not yet created are skipped."""
+    wanted = set(table_names)
+    metadata = MetaData(schema=schema_name)
+    metadata.reflect(bind=engine, only=lambda name, _: name in wanted)
+    return metadata
+
+def schema_ready(table, constraint_name):
+    """True when a reflected table already has everything steps 8-10 would add."""
+    cols = table.c
+    return (
+        {'created_at', 'updated_at', 'row_hash'} <= set(cols.keys())
+        and cols.updated_at.server_default is not None
+        and isinstance(cols.row_hash.type, sqlalchemy.BigInteger)
+        and any(c.name == constraint_name for c in table.constraints)
+    )
+
+def process_sheet(engine, sheet_name, df, schema_name, metadata=None):
+    """metadata is the MetaData from reflect_tables(); it is reflected here for
+    this one table when not provided."""
     start_time = time.time()
     logger.info(f"▶ Processing sheet '{sheet_name}'")
 
-    # 1) Normalize column names
-    df.columns = (
-        df.columns
-          .str.strip()
-          .str.replace(' ', '_', regex=False)
-          .str.lower()
-    )
-
-    # 2) Log inferred dtypes
-    logger.info(f"Detected dtypes for '{sheet_name}':\n{df.dtypes}")
+    # 1) Normalize column names (one pass of C-level str methods)
+    df.columns = [str(c).strip().replace(' ', '_').lower() for c in df.columns]
 
-    # 3) Convert dtypes
+    # 2) Convert dtypes
     df = df.convert_dtypes()
 
+    # 3) Log the converted dtypes (DEBUG only; skips the repr work at INFO)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Detected dtypes for '{sheet_name}':\n{df.dtypes}")
+
     # 3a) Normalize keys + drop rows missing keys (so ON CONFLICT will match)
     keys = CONFLICT_KEYS.get(sheet_name)
     if not keys:
@@ -80,119 +157,218 @@ def process_sheet(engine, sheet_name, df, schema_name):
     # 4) Compute canonical row_hash (ignores audit cols)
     immutable = ('created_at', 'updated_at', 'row_hash')
     data_cols = [c for c in df.columns if c not in immutable]
-    df['row_hash'] = df.apply(
-        lambda r: hashlib.md5("|".join(_canon(r[c]) for c in data_cols).encode("utf-8")).hexdigest(),
-        axis=1
-    )
+    # canonicalize once, then one vectorized 64-bit hash over the columns (BIGINT)
+    canon = _canon_frame(df[data_cols])
+    hashes = pd.util.hash_pandas_object(canon, index=False)
+    df['row_hash'] = hashes.to_numpy().view('int64')
 
-    # 5) Stamp updated_at
-    df['updated_at'] = datetime.now()
+    # 5) updated_at is stamped by Postgres (column DEFAULT on insert, now() on update)
+    df = df.drop(columns='updated_at', errors='ignore')
 
     # 6) Warn on duplicate hashes (diagnostic)
     dup = df['row_hash'].duplicated().sum()
     if dup:
         logger.warning(f"{dup} duplicate row_hash values in '{sheet_name}'")
 
-    inspector = inspect(engine)
-    table_exists = inspector.has_table(sheet_name, schema=schema_name)
+    if metadata is None:
+        metadata = reflect_tables(engine, schema_name, [sheet_name])
+    table = metadata.tables.get(f"{schema_name}.{sheet_name}")
+    table_exists = table is not None
+    conname = f"uq_{sheet_name}_{'_'.join(keys)}"
 
     with engine.begin() as conn:
-        conn.execute(text(f"SET search_path TO {schema_name}"))
-
-        # 8) Create table if missing (schema from the frame)
-        if not table_exists:
-            df.head(0).to_sql(
-                name=sheet_name,
-                con=conn,
-                schema=schema_name,
-                if_exists='append',
-                index=False
-            )
-            logger.info(f"✓ Created table '{schema_name}.{sheet_name}'")
-
-        # 9) Ensure audit/hash columns
-        conn.execute(text(f"""
-            ALTER TABLE {schema_name}.{sheet_name}
-              ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
-              ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ,
-              ADD COLUMN IF NOT EXISTS row_hash TEXT;
-            ALTER TABLE {schema_name}.{sheet_name}
-              ALTER COLUMN updated_at DROP DEFAULT;
-        """))
-
-        # 10) Ensure UNIQUE on conflict keys
-        conname = f"uq_{sheet_name}_{'_'.join(keys)}"
-        cols = ", ".join(keys)
-        conn.execute(text(f"""
-            DO $$ BEGIN
-              IF NOT EXISTS (
-                SELECT 1
-                  FROM pg_constraint
-                 WHERE conrelid = '{schema_name}.{sheet_name}'::regclass
-                   AND conname = '{conname}'
-              ) THEN
-                ALTER TABLE {schema_name}.{sheet_name}
-                  ADD CONSTRAINT {conname} UNIQUE ({cols});
-              END IF;
-            END $$;
-        """))
-
-        # 11) Reflect table metadata for upsert
-        meta = MetaData()
-        meta.clear()
-        table = Table(sheet_name, meta, autoload_with=conn, schema=schema_name)
-
-        # 12) Prepare and execute UPSERT
-        # Generic null cleaner: NaN/NaT -> None (NULL in DB)
-        df = df.where(pd.notna(df), None)
-
-        records = df.to_dict(orient='records')
-        stmt = insert(table).values(records)
-        update_cols = {
-            c.name: stmt.excluded[c.name]
-            for c in table.columns
-            if c.name not in (*keys, 'created_at')
-        }
-        update_cols['updated_at'] = text('now()')
-
-        upsert = stmt.on_conflict_do_update(
-            index_elements=keys,
-            set_=update_cols,
-            where=(table.c.row_hash != stmt.excluded.row_hash)
+        tbl = _ident(conn, schema_name, sheet_name)
+        conn.execute(text(f"SET search_path TO {_ident(conn, schema_name)}"))
+
+        # 8-10) DDL only when the reflected table is missing something
+        if not table_exists or not schema_ready(table, conname):
+            # 8) Create table if missing (schema from the frame)
+            if not table_exists:
+                df.head(0).to_sql(
+                    name=sheet_name,
+                    con=conn,
+                    schema=schema_name,
+                    if_exists='append',
+                    index=False
+                )
+                logger.info(f"✓ Created table '{schema_name}.{sheet_name}'")
+
+            # 9) Ensure audit/hash columns
+            conn.execute(text(f"""
+                ALTER TABLE {tbl}
+                  ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                  ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ,
+                  ADD COLUMN IF NOT EXISTS row_hash BIGINT;
+                ALTER TABLE {tbl}
+                  ALTER COLUMN updated_at SET DEFAULT now();
+            """))
+
+            # 9a) Migrate a legacy TEXT (md5 hex) row_hash to BIGINT; rows rehash on this run
+            conn.execute(text(f"""
+                DO $$ BEGIN
+                  IF EXISTS (
+                    SELECT 1
+                      FROM information_schema.columns
+                     WHERE table_schema = {_lit(conn, schema_name)}
+                       AND table_name = {_lit(conn, sheet_name)}
+                       AND column_name = 'row_hash'
+                       AND data_type <> 'bigint'
+                  ) THEN
+                    ALTER TABLE {tbl}
+                      ALTER COLUMN row_hash TYPE BIGINT USING NULL;
+                  END IF;
+                END $$;
+            """))
+
+            # 10) Ensure UNIQUE on conflict keys
+            cols = ", ".join(_ident(conn, k) for k in keys)
+            conn.execute(text(f"""
+                DO $$ BEGIN
+                  IF NOT EXISTS (
+                    SELECT 1
+                      FROM pg_constraint
+                     WHERE conrelid = {_lit(conn, tbl)}::regclass
+                       AND conname = {_lit(conn, conname)}
+                  ) THEN
+                    ALTER TABLE {tbl}
+                      ADD CONSTRAINT {_ident(conn, conname)} UNIQUE ({cols});
+                  END IF;
+                END $$;
+            """))
+
+        # 11) Client-side diff: keys are part of the hash, so a row whose row_hash is
+        # already stored is unchanged and need not be sent at all. A NULL hash
+        # (nulled by the 9a migration) may belong to a row gone from source, so
+        # any NULL counts as stale and lets the key-based delete run
+        stored = pd.Series(
+            conn.execute(text(f"""
+                SELECT row_hash FROM {tbl}
+            """)).scalars().all(),
+            dtype='Int64'
         )
-
-        # Execute UPSERT
-        result = conn.execute(upsert)
-
-        # 13) Delete stale rows no longer in source
-        incoming_hashes = tuple(df['row_hash'].unique())
-        if incoming_hashes:
-            delete_stmt = text(f"""
-                DELETE FROM {schema_name}.{sheet_name}
-                WHERE row_hash IS NOT NULL
-                  AND row_hash NOT IN :hashes
-            """).bindparams(hashes=incoming_hashes)
-            deleted = conn.execute(delete_stmt).rowcount
+        existing = stored.dropna().astype('int64')
+        changed = df[~df['row_hash'].isin(existing)]
+        has_stale = not df.empty and (
+            stored.isna().any() or (~existing.isin(df['row_hash'])).any()
+        )
+        logger.info(f"{len(df) - len(changed)} unchanged rows skipped in '{sheet_name}'")
+
+        # 12) Prepare and execute UPSERT (same ON CONFLICT clause for both paths);
+        # columns come from the frame, so no catalog reflection is needed
+        cols = ", ".join(_ident(conn, c) for c in df.columns)
+        set_list = ",\n                  ".join(
+            f"{_ident(conn, c)} = EXCLUDED.{_ident(conn, c)}"
+            for c in df.columns
+            if c not in (*keys, 'created_at', 'updated_at')
+        )
+        key_cols = ", ".join(_ident(conn, k) for k in keys)
+        on_conflict = f"""
+            ON CONFLICT ({key_cols}) DO UPDATE
+              SET {set_list},
+              updated_at = now()
+            WHERE t.row_hash IS DISTINCT FROM EXCLUDED.row_hash
+        """
+
+        upserted = 0
+        if len(changed) > COPY_THRESHOLD:
+            # 12b) Large change set: COPY into a temp stage, then one INSERT ... SELECT
+            stage = _ident(conn, f"stg_{sheet_name}")
+            conn.execute(text(f"""
+                CREATE TEMP TABLE {stage}
+                  (LIKE {tbl} INCLUDING DEFAULTS)
+                  ON COMMIT DROP
+            """))
+            _copy_frame(conn, changed, stage)
+
+            upserted = conn.execute(text(f"""
+                INSERT INTO {tbl} AS t ({cols})
+                SELECT {cols} FROM {stage}
+                {on_conflict}
+            """)).rowcount
+        elif not changed.empty:
+            # Positional tuples straight into execute_values (no per-row dicts);
+            # NaN/NaT/NA -> None only here, at the serialization boundary, and
+            # astype(object) boxes numpy scalars into types psycopg2 can adapt
+            rows = changed.astype(object).where(changed.notna(), None).itertuples(index=False, name=None)
+            cursor = conn.connection.cursor()
+            try:
+                # fetch=True gathers RETURNING rows across every page
+                upserted = len(execute_values(
+                    cursor,
+                    f"""
+                    INSERT INTO {tbl} AS t ({cols})
+                    VALUES %s
+                    {on_conflict}
+                    RETURNING 1
+                    """,
+                    rows,
+                    page_size=1000,
+                    fetch=True
+                ))
+            finally:
+                cursor.close()
+
+        # 13) Delete stale rows whose conflict keys are no longer in source
+        # (anti-join on COPYed keys, served by the UNIQUE index); skipped when
+        # the diff shows every stored hash is still present
+        if has_stale:
+            conn.execute(text(f"""
+                CREATE TEMP TABLE incoming_keys ON COMMIT DROP AS
+                  SELECT {key_cols} FROM {tbl} WITH NO DATA
+            """))
+            _copy_frame(conn, df[keys].drop_duplicates(), "incoming_keys")
+            key_match = " AND ".join(
+                f"k.{_ident(conn, k)} = t.{_ident(conn, k)}" for k in keys
+            )
+            deleted = conn.execute(text(f"""
+                DELETE FROM {tbl} t
+                WHERE NOT EXISTS (
+                  SELECT 1 FROM incoming_keys k WHERE {key_match}
+                )
+            """)).rowcount
             logger.info(f"🗑️ Deleted {deleted} stale rows from '{sheet_name}'")
 
-        logger.info(f"Upserted {result.rowcount} rows (only data & updated_at on change)")
+        logger.info(f"Upserted {upserted} rows (only data & updated_at on change)")
 
     elapsed = time.time() - start_time
     logger.info(f"✔ Finished '{sheet_name}' in {elapsed:.2f}s\n")
 
 def process_excel_tabs(engine, excel_file, sheet_list, schema_name):
     try:
-        excel = pd.ExcelFile(excel_file)
+        excel = pd.ExcelFile(excel_file, engine=EXCEL_ENGINE)
     except Exception as e:
         logger.error(f"Cannot open Excel '{excel_file}': {e}")
         sys.exit(1)
 
-    for sheet in sheet_list:
+    # Parse serially (the workbook handle is not thread-safe), then fan out
+    frames = {}
+    for sheet in dict.fromkeys(sheet_list):
         if sheet not in excel.sheet_names:
             logger.warning(f"Sheet '{sheet}' missing; skipping")
             continue
-        df = excel.parse(sheet)
-        process_sheet(engine, sheet, df, schema_name)
+        frames[sheet] = excel.parse(sheet)
+    if not frames:
+        return
+
+    # One catalog pass for every target table, shared by the workers
+    metadata = reflect_tables(engine, schema_name, frames)
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(frames))) as executor:
+        future_to_sheet = {
+            executor.submit(process_sheet, engine, sheet, df, schema_name, metadata): sheet
+            for sheet, df in frames.items()
+        }
+        for future in as_completed(future_to_sheet):
+            sheet = future_to_sheet[future]
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"❌ Sheet '{sheet}' failed: {e}")
+                failed.append(sheet)
+
+    if failed:
+        sys.exit(1)
 
 def main():
     load_dotenv()
@@ -207,7 +383,12 @@ def main():
     schema = os.getenv('SCHEMA_NAME','public')
 
     try:
-        engine = sqlalchemy.create_engine(os.getenv('DATABASE_URL'))
+        engine = sqlalchemy.create_engine(
+            os.getenv('DATABASE_URL'),
+            pool_size=MAX_WORKERS,
+            max_overflow=0,
+            pool_pre_ping=True,
+        )
         with engine.connect(): pass
     except Exception as e:
         logger.error(f"DB connection failed: {e}")
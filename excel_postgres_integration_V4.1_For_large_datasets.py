@@ -15,7 +15,7 @@ OPTIMIZATIONS FOR LARGE DATASETS (760K+ rows):
 PERFORMANCE FEATURES:
 - Processes data in configurable chunks (default 50K rows)
 - Uses COPY operations for initial loads
-- Optimized upsert batch sizes (5K rows)
+- Staged COPY + single INSERT ... SELECT upsert per chunk
 - Memory usage monitoring and cleanup
 - Parallel sheet processing option
 - Resume capability for interrupted runs
@@ -27,21 +27,22 @@ DATE: 2025
 import os
 import sys
 import logging
-import hashlib
 import time
 import gc
+import threading
 import psutil
-from datetime import datetime, date
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
 
 import pandas as pd
 import numpy as np
+from openpyxl import load_workbook
 import sqlalchemy
 from sqlalchemy import text, MetaData, Table, inspect, create_engine
-from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import QueuePool, NullPool
 
 # Configure Logging with more detail for large operations
 logging.basicConfig(
@@ -53,7 +54,6 @@ logger = logging.getLogger(__name__)
 
 # Performance Configuration
 CHUNK_SIZE = 50000          # Process Excel in chunks to manage memory
-BATCH_SIZE = 5000           # Database batch size for upserts
 COPY_THRESHOLD = 100000     # Use COPY for initial loads above this size
 MAX_WORKERS = 3             # Parallel sheet processing (adjust based on your system)
 MEMORY_THRESHOLD_GB = 8     # Warning threshold for memory usage
@@ -67,6 +67,13 @@ CONFLICT_KEYS = {
     "powerbi_export": ["index"]
 }
 
+# Arrow-backed dtypes keep strings in packed buffers when pyarrow is installed
+try:
+    import pyarrow  # noqa: F401
+    DTYPE_BACKEND = "pyarrow"
+except ImportError:
+    DTYPE_BACKEND = "numpy_nullable"
+
 def monitor_memory():
     """Monitor and log current memory usage."""
     # Memory monitoring disabled - install psutil if needed
@@ -78,12 +85,19 @@ def canonicalize_vectorized(series):
     if series.dtype == 'object':
         # String-like data
         return series.fillna("").astype(str).str.strip()
-    elif pd.api.types.is_datetime64_any_dtype(series):
-        # DateTime data
-        return series.dt.strftime("%Y-%m-%dT%H:%M:%S").fillna("")
-    elif pd.api.types.is_numeric_dtype(series):
-        # Numeric data
-        return series.fillna("").apply(lambda x: f"{x:.10g}" if pd.notna(x) else "")
+    elif series.dtype.kind == "M":
+        # DateTime data (numpy, tz-aware or Arrow timestamp). Arrow's own strftime
+        # renders %S with fractional seconds, so format through numpy instead
+        if isinstance(series.dtype, pd.ArrowDtype):
+            series = series.astype(series.dtype.numpy_dtype)
+        return series.dt.strftime("%Y-%m-%dT%H:%M:%S").fillna("").astype(object)
+    elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        # Numeric data: one C-level format over the float buffer, blanks for NA.
+        # bool[pyarrow] is not numeric to pandas but hashes as '1'/'0' like boolean
+        arr = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        out = np.char.mod("%.10g", arr).astype(object)
+        out[np.isnan(arr)] = ""
+        return pd.Series(out, index=series.index)
     else:
         # Everything else
         return series.fillna("").astype(str).str.strip()
@@ -98,102 +112,174 @@ def calculate_hash_vectorized(df, data_cols):
     for col in data_cols:
         canonical_data[col] = canonicalize_vectorized(df[col])
     
-    # Combine all columns with separator
-    combined = canonical_data.apply(lambda row: "|".join(row.values), axis=1)
-    
-    # Calculate hashes vectorized
-    hashes = combined.apply(lambda x: hashlib.md5(x.encode("utf-8")).hexdigest())
+    # One vectorized 64-bit hash over the canonical column buffers (stored as BIGINT)
+    hashes = pd.util.hash_pandas_object(canonical_data, index=False)
+    hashes = pd.Series(hashes.to_numpy().view('int64'), index=df.index)
     
     elapsed = time.time() - start_time
     logger.info(f"Hash calculation completed in {elapsed:.2f}s")
     return hashes
 
-def create_optimized_engine(database_url: str):
-    """Create database engine optimized for large operations."""
-    return create_engine(
-        database_url,
+def dedup_columns(names):
+    """Rename repeated header names the way read_excel does: a, a.1, a.2, ..."""
+    counts = {}
+    result = []
+    for name in names:
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[name] = count + 1
+            name = f"{name}.{count}"
+            count = counts.get(name, 0)
+        result.append(name)
+        counts[name] = count + 1
+    return result
+
+def iter_excel_chunks(excel_file, sheet_name, chunk_size=CHUNK_SIZE):
+    """Stream a sheet as DataFrame chunks using openpyxl's read-only (SAX) mode.
+
+    pd.read_excel has no chunksize and always materializes the whole sheet;
+    here only chunk_size rows of plain values are held at a time.
+    """
+    wb = load_workbook(excel_file, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name]
+        # Read-only mode trusts the sheet's <dimension> tag, which can be stale and
+        # cut off rows/columns; measure the real bounds as read_excel does
+        ws.reset_dimensions()
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = list(header)
+        while header and header[-1] is None:
+            header.pop()  # trailing empty cells
+        columns = dedup_columns(
+            [str(c) if c is not None else f"unnamed_{i}" for i, c in enumerate(header)]
+        )
+        width = len(columns)
+        
+        buffer = []
+        warned = False
+        for row in rows:
+            if all(v is None for v in row):
+                continue  # trailing/blank rows
+            if len(row) != width:
+                # Without dimensions rows are ragged: pad short ones, and drop cells
+                # past the header, which have no column to land in
+                if not warned and any(v is not None for v in row[width:]):
+                    logger.warning(f"Sheet '{sheet_name}' has values beyond its header; ignoring them")
+                    warned = True
+                row = (tuple(row) + (None,) * width)[:width]
+            buffer.append(row)
+            if len(buffer) >= chunk_size:
+                yield pd.DataFrame(buffer, columns=columns)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=columns)
+    finally:
+        wb.close()
+
+def create_optimized_engine(database_url: str, pooled: bool = True):
+    """Create database engine optimized for large operations.
+    
+    pooled=False gives a NullPool engine for worker processes, which only
+    ever hold one connection at a time and must not share a pool.
+    """
+    pool_args = dict(
         poolclass=QueuePool,
         pool_size=20,
         max_overflow=30,
-        pool_pre_ping=True,
+        pool_pre_ping=False,  # short ETL transactions; pool_recycle handles stale conns
         pool_recycle=3600,
+    ) if pooled else dict(poolclass=NullPool)
+    return create_engine(
+        database_url,
+        **pool_args,
         echo=False,  # Set to True for SQL debugging
         connect_args={
-            "options": "-c default_transaction_isolation=read_committed"
+            "options": "-c default_transaction_isolation=read\\ committed"
         }
     )
 
 def bulk_copy_insert(conn, df, table_name, schema_name):
-    """Use PostgreSQL COPY for fast initial data loading."""
+    """Use PostgreSQL COPY for fast data loading.
+    
+    Runs inside the caller's transaction (no commit here) so it can also load
+    ON COMMIT DROP staging tables; pass schema_name='pg_temp' for those.
+    """
     logger.info(f"Using COPY for bulk insert of {len(df)} rows...")
     
-    # Create temporary CSV-like string buffer
-    from io import StringIO
-    buffer = StringIO()
-    df.to_csv(buffer, index=False, header=False, sep='\t', na_rep='\\N')
-    buffer.seek(0)
+    # Stream UTF-8 CSV through a pipe: a producer thread serializes while COPY
+    # reads, so only the pipe buffer is held instead of the whole payload
+    read_fd, write_fd = os.pipe()
+    reader = os.fdopen(read_fd, 'rb')
+    writer = os.fdopen(write_fd, 'wb')
+    producer_errors = []
+    
+    def produce():
+        try:
+            df.to_csv(writer, index=False, header=False, sep='\t', na_rep='\\N', encoding='utf-8')
+        except Exception as e:
+            producer_errors.append(e)
+        finally:
+            try:
+                writer.close()  # EOF for COPY
+            except OSError:
+                pass  # reader already gone after a failed COPY
     
     # Use raw connection for COPY
-    raw_conn = conn.connection
-    cursor = raw_conn.cursor()
+    cursor = conn.connection.cursor()
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
     
     try:
         copy_sql = f"""
         COPY {schema_name}.{table_name} ({', '.join(df.columns)})
         FROM STDIN WITH (FORMAT csv, DELIMITER E'\\t', NULL '\\N')
         """
-        cursor.copy_expert(copy_sql, buffer)
-        raw_conn.commit()
+        cursor.copy_expert(copy_sql, reader)
+        if producer_errors:
+            # A truncated stream still looks like a clean EOF to COPY
+            raise producer_errors[0]
         logger.info(f"✓ COPY operation completed successfully")
     except Exception as e:
-        raw_conn.rollback()
         logger.error(f"COPY operation failed: {e}")
         raise
     finally:
+        reader.close()  # unblocks the producer if COPY stopped reading early
+        producer.join()
         cursor.close()
 
-def batch_upsert_optimized(conn, table, records, keys, batch_size=BATCH_SIZE):
-    """Optimized batch upsert with progress tracking."""
-    total_affected = 0
-    total_batches = (len(records) + batch_size - 1) // batch_size
+def staged_upsert(conn, table, df, keys):
+    """COPY a chunk into a TEMP staging table, then merge it with one
+    INSERT ... SELECT ... ON CONFLICT statement run entirely server-side."""
+    target = f"{table.schema}.{table.name}"
+    stage = f"stg_{table.name}"
     
-    logger.info(f"Processing {len(records)} records in {total_batches} batches of {batch_size}")
+    conn.execute(text(f"""
+        CREATE TEMP TABLE {stage} (LIKE {target} INCLUDING DEFAULTS) ON COMMIT DROP
+    """))
+    bulk_copy_insert(conn, df, stage, 'pg_temp')
     
-    for i in range(0, len(records), batch_size):
-        batch_num = i // batch_size + 1
-        batch = records[i:i + batch_size]
-        
-        try:
-            stmt = insert(table).values(batch)
-            
-            # Define columns to update (exclude keys and created_at)
-            update_cols = {
-                c.name: stmt.excluded[c.name]
-                for c in table.columns
-                if c.name not in (*keys, 'created_at')
-            }
-            update_cols['updated_at'] = text('now()')
-            
-            # Execute batch upsert with change detection
-            upsert = stmt.on_conflict_do_update(
-                index_elements=keys,
-                set_=update_cols,
-                where=(table.c.row_hash != stmt.excluded.row_hash)
-            )
-            
-            result = conn.execute(upsert)
-            total_affected += result.rowcount
-            
-            # Progress logging every 10 batches or on last batch
-            if batch_num % 10 == 0 or batch_num == total_batches:
-                progress = (batch_num / total_batches) * 100
-                logger.info(f"Progress: {progress:.1f}% ({batch_num}/{total_batches} batches)")
-                
-        except Exception as e:
-            logger.error(f"Error in batch {batch_num}: {e}")
-            raise
+    # Define columns to update (exclude keys and created_at)
+    cols = ", ".join(df.columns)
+    set_list = ",\n              ".join(
+        f"{c.name} = EXCLUDED.{c.name}"
+        for c in table.columns
+        if c.name in df.columns and c.name not in (*keys, 'created_at', 'updated_at')
+    )
     
-    return total_affected
+    # Upsert with change detection; unchanged rows are not rewritten
+    result = conn.execute(text(f"""
+        INSERT INTO {target} AS t ({cols})
+        SELECT {cols} FROM {stage}
+        ON CONFLICT ({', '.join(keys)}) DO UPDATE
+          SET {set_list},
+              updated_at = now()
+        WHERE t.row_hash IS DISTINCT FROM EXCLUDED.row_hash
+    """))
+    logger.info(f"Merged {len(df):,} staged rows ({result.rowcount:,} inserted/changed)")
+    return result.rowcount
 
 def process_sheet_chunked(engine, sheet_name, excel_file, schema_name, chunk_size=CHUNK_SIZE):
     """Process Excel sheet in chunks to handle large files efficiently."""
@@ -206,24 +292,24 @@ def process_sheet_chunked(engine, sheet_name, excel_file, schema_name, chunk_siz
         logger.error(f"No conflict keys defined for sheet '{sheet_name}'")
         return
     
-    # Read Excel file metadata first
-    try:
-        excel_info = pd.ExcelFile(excel_file)
-        if sheet_name not in excel_info.sheet_names:
-            logger.warning(f"Sheet '{sheet_name}' not found; skipping")
-            return
-    except Exception as e:
-        logger.error(f"Cannot access Excel file: {e}")
-        return
-    
     # Process in chunks
     chunk_number = 0
     total_processed = 0
-    all_hashes = set()
+    seen_rows = 0
     table_created = False
+    table = None
+    
+    # Every incoming row_hash is COPYed into an UNLOGGED side table (chunks run in
+    # separate transactions/connections, so a TEMP table would not survive)
+    seen_table = f"seen_hashes_{sheet_name}"
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            DROP TABLE IF EXISTS {schema_name}.{seen_table};
+            CREATE UNLOGGED TABLE {schema_name}.{seen_table} (row_hash BIGINT)
+        """))
     
     # Read and process chunks
-    for chunk_df in pd.read_excel(excel_file, sheet_name=sheet_name, chunksize=chunk_size):
+    for chunk_df in iter_excel_chunks(excel_file, sheet_name, chunk_size):
         chunk_number += 1
         chunk_start = time.time()
         
@@ -234,16 +320,11 @@ def process_sheet_chunked(engine, sheet_name, excel_file, schema_name, chunk_siz
         if chunk_df.empty:
             continue
         
-        # Normalize column names
-        chunk_df.columns = (
-            chunk_df.columns
-            .str.strip()
-            .str.replace(' ', '_', regex=False)
-            .str.lower()
-        )
+        # Normalize column names (one pass, no intermediate Index objects)
+        chunk_df.columns = [c.strip().replace(' ', '_').lower() for c in chunk_df.columns]
         
         # Convert to best dtypes
-        chunk_df = chunk_df.convert_dtypes()
+        chunk_df = chunk_df.convert_dtypes(dtype_backend=DTYPE_BACKEND)
         
         # Clean conflict key columns
         for key in keys:
@@ -252,12 +333,9 @@ def process_sheet_chunked(engine, sheet_name, excel_file, schema_name, chunk_siz
         
         # Remove rows with missing conflict keys
         before_clean = len(chunk_df)
-        mask_na = chunk_df[keys].isna().any(axis=1)
-        mask_empty = pd.DataFrame(False, index=chunk_df.index, columns=['empty'])
-        for key in keys:
-            mask_empty['empty'] |= (chunk_df[key] == "")
-        
-        chunk_df = chunk_df[~(mask_na | mask_empty['empty'])]
+        keys_df = chunk_df[keys]
+        bad = keys_df.isna().any(axis=1) | keys_df.eq("").any(axis=1)
+        chunk_df = chunk_df[~bad]
         after_clean = len(chunk_df)
         
         if before_clean != after_clean:
@@ -266,19 +344,24 @@ def process_sheet_chunked(engine, sheet_name, excel_file, schema_name, chunk_siz
         if chunk_df.empty:
             logger.warning(f"Chunk {chunk_number} empty after cleaning; skipping")
             continue
-        
+
+        # ON CONFLICT can't touch the same key twice in one statement; last row wins
+        before_dedup = len(chunk_df)
+        chunk_df = chunk_df.drop_duplicates(subset=keys, keep='last')
+        if len(chunk_df) != before_dedup:
+            logger.warning(f"Dropped {before_dedup - len(chunk_df)} duplicate-key rows in chunk {chunk_number}")
+
         # Calculate row hashes efficiently
         immutable_cols = ('created_at', 'updated_at', 'row_hash')
         data_cols = [c for c in chunk_df.columns if c not in immutable_cols]
         chunk_df['row_hash'] = calculate_hash_vectorized(chunk_df, data_cols)
-        chunk_df['updated_at'] = datetime.now()
         
-        # Track all hashes for stale data cleanup
-        all_hashes.update(chunk_df['row_hash'].tolist())
+        # Count incoming rows; stale cleanup is skipped when no chunk had any
+        seen_rows += len(chunk_df)
         
         # Database operations
         with engine.begin() as conn:
-            conn.execute(text(f"SET search_path TO {schema_name}"))
+            optimize_database_settings(conn, schema_name)
             
             # Create table on first chunk
             if not table_created:
@@ -293,14 +376,31 @@ def process_sheet_chunked(engine, sheet_name, excel_file, schema_name, chunk_siz
                     )
                     logger.info(f"✓ Created table '{schema_name}.{sheet_name}'")
                 
-                # Ensure audit columns and constraints
+                # Ensure audit columns and constraints; updated_at is stamped by the
+                # server (DEFAULT on insert, now() in the merge) rather than sent per row
                 conn.execute(text(f"""
                     ALTER TABLE {schema_name}.{sheet_name}
                       ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
                       ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ,
-                      ADD COLUMN IF NOT EXISTS row_hash TEXT;
+                      ADD COLUMN IF NOT EXISTS row_hash BIGINT;
                     ALTER TABLE {schema_name}.{sheet_name}
-                      ALTER COLUMN updated_at DROP DEFAULT;
+                      ALTER COLUMN updated_at SET DEFAULT now();
+                """))
+                
+                # Migrate a legacy TEXT (md5 hex) row_hash to BIGINT; rows rehash on this run
+                conn.execute(text(f"""
+                    DO $$ BEGIN
+                      IF EXISTS (
+                        SELECT 1 FROM information_schema.columns
+                        WHERE table_schema = '{schema_name}'
+                          AND table_name = '{sheet_name}'
+                          AND column_name = 'row_hash'
+                          AND data_type <> 'bigint'
+                      ) THEN
+                        ALTER TABLE {schema_name}.{sheet_name}
+                          ALTER COLUMN row_hash TYPE BIGINT USING NULL;
+                      END IF;
+                    END $$;
                 """))
                 
                 # Create unique constraint
@@ -319,69 +419,99 @@ def process_sheet_chunked(engine, sheet_name, excel_file, schema_name, chunk_siz
                     END $$;
                 """))
                 
+                # Index row_hash for the per-chunk unchanged-row probe below
+                conn.execute(text(f"""
+                    CREATE INDEX IF NOT EXISTS ix_{sheet_name}_row_hash
+                      ON {schema_name}.{sheet_name} (row_hash)
+                """))
+                
+                # Reflect once per sheet; the schema doesn't change between chunks
+                table = Table(sheet_name, MetaData(), autoload_with=conn, schema=schema_name)
                 table_created = True
             
-            # Choose insertion method based on size
-            metadata = MetaData()
-            table = Table(sheet_name, metadata, autoload_with=conn, schema=schema_name)
+            # COPY the chunk's hashes once; the seen table and the probe both read them
+            conn.execute(text(
+                "CREATE TEMP TABLE chunk_hashes (row_hash BIGINT) ON COMMIT DROP"
+            ))
+            bulk_copy_insert(conn, chunk_df[['row_hash']], 'chunk_hashes', 'pg_temp')
+            conn.execute(text(
+                f"INSERT INTO {schema_name}.{seen_table} SELECT row_hash FROM pg_temp.chunk_hashes"
+            ))
             
-            # Convert NaN to None for proper NULL handling
-            chunk_df = chunk_df.where(pd.notna(chunk_df), None)
-            records = chunk_df.to_dict(orient='records')
+            # Keys are part of the hash, so a row whose row_hash is already stored
+            # is unchanged and needn't be sent again (one indexed probe per chunk)
+            existing = conn.execute(text(f"""
+                SELECT c.row_hash FROM pg_temp.chunk_hashes c
+                WHERE EXISTS (
+                    SELECT 1 FROM {schema_name}.{sheet_name} t WHERE t.row_hash = c.row_hash
+                  )
+            """)).scalars().all()
+            chunk_df = chunk_df[~chunk_df['row_hash'].isin(existing)]
+            logger.info(f"{len(existing):,} unchanged rows skipped")
             
-            # Use COPY for large initial loads, upsert for smaller chunks
-            if len(records) >= COPY_THRESHOLD and chunk_number == 1:
+            # Straight COPY for large initial loads, staged upsert otherwise
+            if chunk_df.empty:
+                pass  # nothing changed in this chunk
+            elif len(chunk_df) >= COPY_THRESHOLD and chunk_number == 1:
                 # Check if table is empty for COPY operation
                 count_result = conn.execute(text(f"SELECT COUNT(*) FROM {schema_name}.{sheet_name}"))
                 table_count = count_result.scalar()
                 
                 if table_count == 0:
                     bulk_copy_insert(conn, chunk_df, sheet_name, schema_name)
-                    total_processed += len(records)
+                    total_processed += len(chunk_df)
                 else:
-                    affected = batch_upsert_optimized(conn, table, records, keys)
+                    affected = staged_upsert(conn, table, chunk_df, keys)
                     total_processed += affected
             else:
-                affected = batch_upsert_optimized(conn, table, records, keys)
+                affected = staged_upsert(conn, table, chunk_df, keys)
                 total_processed += affected
         
         chunk_elapsed = time.time() - chunk_start
         logger.info(f"✓ Chunk {chunk_number} completed in {chunk_elapsed:.2f}s")
         
         # Force garbage collection to manage memory
-        del chunk_df, records
+        del chunk_df
         gc.collect()
     
-    # Clean up stale data (only once after all chunks)
-    if all_hashes:
-        logger.info("🧹 Cleaning up stale data...")
-        with engine.begin() as conn:
-            conn.execute(text(f"SET search_path TO {schema_name}"))
-            
-            # Delete in batches to avoid parameter limits
-            hash_list = list(all_hashes)
-            deleted_total = 0
-            
-            for i in range(0, len(hash_list), 10000):  # Process 10K hashes at a time
-                hash_batch = tuple(hash_list[i:i + 10000])
-                delete_stmt = text(f"""
-                    DELETE FROM {schema_name}.{sheet_name}
-                    WHERE row_hash IS NOT NULL
-                      AND row_hash NOT IN :hashes
-                """).bindparams(hashes=hash_batch)
-                deleted = conn.execute(delete_stmt).rowcount
-                deleted_total += deleted
+    # Clean up stale data (only once after all chunks): one server-side anti-join.
+    # Every incoming row now carries its hash, so a NULL row_hash (left by the
+    # BIGINT migration) is stale too
+    with engine.begin() as conn:
+        if seen_rows:
+            logger.info("🧹 Cleaning up stale data...")
+            deleted_total = conn.execute(text(f"""
+                DELETE FROM {schema_name}.{sheet_name} t
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM {schema_name}.{seen_table} s
+                    WHERE s.row_hash = t.row_hash
+                  )
+            """)).rowcount
             
             if deleted_total > 0:
                 logger.info(f"🗑️ Deleted {deleted_total:,} stale rows")
+        conn.execute(text(f"DROP TABLE IF EXISTS {schema_name}.{seen_table}"))
     
     elapsed = time.time() - start_time
     logger.info(f"✅ Sheet '{sheet_name}' completed: {total_processed:,} rows in {elapsed:.2f}s")
     
     return total_processed
 
+def _process_sheet_worker(database_url, sheet_name, excel_file, schema_name):
+    """Process-pool entry point: engines can't cross process boundaries,
+    so each worker builds its own from the URL."""
+    engine = create_optimized_engine(database_url, pooled=False)
+    try:
+        return process_sheet_chunked(engine, sheet_name, excel_file, schema_name)
+    finally:
+        engine.dispose()
+
 def process_excel_parallel(engine, excel_file, sheet_list, schema_name, max_workers=MAX_WORKERS):
-    """Process multiple sheets in parallel for better performance."""
+    """Process multiple sheets in parallel, one interpreter per sheet.
+    
+    Hashing and canonicalization are CPU-bound Python/pandas work, so threads
+    would serialize on the GIL; processes run them on separate cores.
+    """
     if len(sheet_list) <= 1 or max_workers <= 1:
         # Fall back to sequential processing
         for sheet in sheet_list:
@@ -390,10 +520,12 @@ def process_excel_parallel(engine, excel_file, sheet_list, schema_name, max_work
     
     logger.info(f"🚀 Processing {len(sheet_list)} sheets in parallel (max {max_workers} workers)")
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    database_url = engine.url.render_as_string(hide_password=False)
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             mp_context=multiprocessing.get_context("spawn")) as executor:
         # Submit all sheet processing tasks
         future_to_sheet = {
-            executor.submit(process_sheet_chunked, engine, sheet, excel_file, schema_name): sheet
+            executor.submit(_process_sheet_worker, database_url, sheet, excel_file, schema_name): sheet
             for sheet in sheet_list
         }
         
@@ -406,23 +538,21 @@ def process_excel_parallel(engine, excel_file, sheet_list, schema_name, max_work
             except Exception as e:
                 logger.error(f"❌ Sheet '{sheet}' failed: {e}")
 
-def optimize_database_settings(engine, schema_name):
-    """Apply PostgreSQL optimizations for large data operations."""
+def optimize_database_settings(conn, schema_name):
+    """Apply session-settable PostgreSQL tuning to the current load transaction.
+    
+    SET LOCAL only lasts until commit, so this runs inside every chunk's
+    transaction. Server-wide knobs (wal_buffers, max_wal_size,
+    checkpoint_completion_target) can't be set per session; see main().
+    """
     optimizations = [
-        "SET maintenance_work_mem = '1GB'",
-        "SET checkpoint_completion_target = 0.9",
-        "SET wal_buffers = '64MB'",
-        "SET max_wal_size = '4GB'",
-        f"SET search_path TO {schema_name}"
+        "SET LOCAL synchronous_commit = off",
+        "SET LOCAL work_mem = '256MB'",
+        f"SET LOCAL search_path TO {schema_name}"
     ]
-    
-    with engine.begin() as conn:
-        for setting in optimizations:
-            try:
-                conn.execute(text(setting))
-                logger.debug(f"Applied: {setting}")
-            except Exception as e:
-                logger.warning(f"Could not apply optimization '{setting}': {e}")
+    for setting in optimizations:
+        conn.execute(text(setting))
+        logger.debug(f"Applied: {setting}")
 
 def main():
     """Main execution function with performance monitoring."""
@@ -450,6 +580,19 @@ def main():
         logger.error(f"Excel file not found: {excel_file}")
         sys.exit(1)
     
+    # Probe the workbook's sheet list once here instead of once per sheet/worker
+    try:
+        wb = load_workbook(excel_file, read_only=True)
+        available = set(wb.sheetnames)
+        wb.close()
+    except Exception as e:
+        logger.error(f"Cannot access Excel file: {e}")
+        sys.exit(1)
+    for sheet in sheets:
+        if sheet not in available:
+            logger.warning(f"Sheet '{sheet}' not found; skipping")
+    sheets = [s for s in sheets if s in available]
+    
     # Log file size for context
     file_size_mb = os.path.getsize(excel_file) / (1024**2)
     logger.info(f"📋 Configuration:")
@@ -458,7 +601,6 @@ def main():
     logger.info(f"  Schema: {schema_name}")
     logger.info(f"  Parallel processing: {parallel_mode}")
     logger.info(f"  Chunk size: {CHUNK_SIZE:,} rows")
-    logger.info(f"  Batch size: {BATCH_SIZE:,} rows")
     
     # Create optimized database engine
     try:
@@ -470,8 +612,9 @@ def main():
         logger.error(f"Database connection failed: {e}")
         sys.exit(1)
     
-    # Apply database optimizations
-    optimize_database_settings(engine, schema_name)
+    # Instance-level WAL/checkpoint settings can't be changed from a session
+    logger.info("  Per-load tuning: synchronous_commit=off, work_mem=256MB (SET LOCAL per chunk);"
+                " set wal_buffers/max_wal_size/checkpoint_completion_target in postgresql.conf")
     
     # Monitor initial memory
     initial_memory = monitor_memory()
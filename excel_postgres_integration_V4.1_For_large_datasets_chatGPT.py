@@ -65,7 +65,7 @@ from dotenv import load_dotenv
 
 import pandas as pd
 import sqlalchemy
-from sqlalchemy import text, MetaData, Table, inspect
+from sqlalchemy import text, MetaData, Table
 from sqlalchemy.dialects.postgresql import insert
 
 # Configure Logging
@@ -106,7 +106,7 @@ def canonicalize(value):
     # Everything else as string
     return str(value).strip()
 
-from sqlalchemy import text, MetaData, Table, inspect  # already present
+from sqlalchemy import text, MetaData, Table  # already present
 from sqlalchemy.dialects.postgresql import insert      # already present
 
 def chunked(seq, size):
@@ -114,8 +114,19 @@ def chunked(seq, size):
     for i in range(0, len(seq), size):
         yield seq[i:i+size]
 
-def process_sheet(engine, sheet_name, df, schema_name):
-    """Process a single Excel sheet and sync with database (batched + safe delete)."""
+def reflect_tables(engine, schema_name, table_names):
+    """Reflect the target tables in one catalog pass; tables not yet created are skipped."""
+    wanted = set(table_names)
+    metadata = MetaData(schema=schema_name)
+    metadata.reflect(bind=engine, only=lambda name, _: name in wanted)
+    return metadata
+
+def process_sheet(engine, sheet_name, df, schema_name, metadata=None):
+    """Process a single Excel sheet and sync with database (batched + safe delete).
+
+    metadata is the MetaData from reflect_tables(); it is reflected here for
+    this one table when not provided.
+    """
     start_time = time.time()
     logger.info(f"▶ Processing sheet '{sheet_name}'")
 
@@ -180,28 +191,29 @@ def process_sheet(engine, sheet_name, df, schema_name):
     if dropped:
         logger.warning(f"Dropped {dropped} rows due to missing conflict keys: {keys}")
 
-    # 6) Calculate row hash for change detection
+    # 6) Calculate row hash for change detection: canonicalize column by column,
+    # then join and hash each row's values (no per-row Series from df.apply)
     immutable_cols = ('created_at', 'updated_at', 'row_hash')
     data_cols = [c for c in df.columns if c not in immutable_cols]
-    df['row_hash'] = df.apply(
-        lambda row: hashlib.md5(
-            "|".join(canonicalize(row[c]) for c in data_cols).encode("utf-8")
-        ).hexdigest(),
-        axis=1
-    )
+    canon_cols = [df[c].map(canonicalize).tolist() for c in data_cols]
+    df['row_hash'] = [
+        hashlib.md5("|".join(values).encode("utf-8")).hexdigest()
+        for values in zip(*canon_cols)
+    ]
 
-    # 7) Add updated_at timestamp
-    now_ts = datetime.now()
-    df['updated_at'] = now_ts
+    # 7) updated_at is stamped by Postgres (column DEFAULT on insert, now() on update)
+    df = df.drop(columns='updated_at', errors='ignore')
 
     # 8) Duplicate hash notice
     dup = int(df['row_hash'].duplicated().sum())
     if dup:
         logger.warning(f"{dup} duplicate row_hash values in '{sheet_name}'")
 
-    # 9) Check if table exists
-    inspector = inspect(engine)
-    table_exists = inspector.has_table(sheet_name, schema=schema_name)
+    # 9) Check if table exists (from the up-front reflection, no extra catalog query)
+    if metadata is None:
+        metadata = reflect_tables(engine, schema_name, [sheet_name])
+    table = metadata.tables.get(f"{schema_name}.{sheet_name}")
+    table_exists = table is not None
 
     # ---- DB work in a single transaction
     with engine.begin() as conn:
@@ -226,7 +238,7 @@ def process_sheet(engine, sheet_name, df, schema_name):
               ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ,
               ADD COLUMN IF NOT EXISTS row_hash TEXT;
             ALTER TABLE {schema_name}.{sheet_name}
-              ALTER COLUMN updated_at DROP DEFAULT;
+              ALTER COLUMN updated_at SET DEFAULT now();
         """))
 
         # 12) Unique constraint on keys
@@ -245,9 +257,11 @@ def process_sheet(engine, sheet_name, df, schema_name):
             END $$;
         """))
 
-        # 13) Reflect table metadata
-        metadata = MetaData()
-        table = Table(sheet_name, metadata, autoload_with=conn, schema=schema_name)
+        # 13) Reflect table metadata only when this run created the table or
+        # added audit columns; otherwise reuse the up-front reflection
+        if not table_exists or not {'created_at', 'updated_at', 'row_hash'} <= set(table.columns.keys()):
+            table = Table(sheet_name, metadata, autoload_with=conn, schema=schema_name,
+                          extend_existing=True)
 
         # 14) Convert NaN/NaT to None for proper NULL handling
         df = df.where(pd.notna(df), None)
@@ -325,6 +339,9 @@ def process_excel_tabs(engine, excel_file, sheet_list, schema_name):
         logger.error(f"Cannot open Excel file '{excel_file}': {e}")
         sys.exit(1)
     
+    # Reflect every target table once up front instead of per sheet
+    metadata = reflect_tables(engine, schema_name, sheet_list)
+    
     # Process each requested sheet
     for sheet in sheet_list:
         if sheet not in excel.sheet_names:
@@ -337,7 +354,7 @@ def process_excel_tabs(engine, excel_file, sheet_list, schema_name):
             logger.warning(f"Sheet '{sheet}' is empty; skipping")
             continue
             
-        process_sheet(engine, sheet, df, schema_name)
+        process_sheet(engine, sheet, df, schema_name, metadata)
 
 def main():
     """Main execution function."""
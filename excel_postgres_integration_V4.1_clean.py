@@ -11,7 +11,7 @@ KEY FEATURES:
 - Automated Excel sheet processing with multiple worksheet support
 - Column name normalization (converts spaces to underscores, lowercases)
 - Intelligent data type detection and conversion
-- Row-level change detection using MD5 hashing
+- Row-level change detection using vectorized 64-bit row hashing
 - Upsert operations (insert new, update changed records only)
 - Stale data cleanup (removes rows no longer present in source)
 - Audit trail with created_at/updated_at timestamps
@@ -60,13 +60,18 @@ import sys
 import logging
 import hashlib
 import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from io import BytesIO
 from datetime import datetime, date
 from dotenv import load_dotenv
 
 import pandas as pd
+import numpy as np
 import sqlalchemy
-from sqlalchemy import text, MetaData, Table, inspect
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import text, MetaData, Table
+from sqlalchemy.pool import NullPool
+from psycopg2.extras import execute_values
 
 # Configure Logging
 logging.basicConfig(
@@ -76,6 +81,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Sheets with more rows than this are COPYed into a temp stage before the upsert
+COPY_THRESHOLD = 1000
+# Rows per execute_values page on the small-sheet upsert path
+UPSERT_BATCH_SIZE = 1000
+# Per-sheet digests of the last successful sync, for skipping unchanged sheets
+SYNC_META_TABLE = "_sync_meta"
+# Sheets write independent tables; parse/hash/sync up to this many at once
+MAX_WORKERS = 4
+
 # Define conflict keys per sheet (must match normalized column names)
 CONFLICT_KEYS = {
     "vendor_search_results": ["uniqueid", "b2gnow_vendor_number"],
@@ -95,6 +109,20 @@ CONFLICT_KEYS = {
     "contract_powerbi": ["index"],
 }
 
+# Arrow-backed strings let .str.strip() run in Arrow's C++ kernels when pyarrow is installed
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    STRING_DTYPE = "string"
+
+# Excel reader: Rust-backed calamine when installed, openpyxl otherwise
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"
+
 def canonicalize(value):
     """Canonicalize values for consistent hashing across runs."""
     # Handle null values
@@ -116,18 +144,83 @@ def canonicalize(value):
     # Everything else as string
     return str(value).strip()
 
-def process_sheet(engine, sheet_name, df, schema_name):
-    """Process a single Excel sheet and sync with database."""
+def canonicalize_series(series):
+    """Column-wise canonicalize(): dispatch on dtype once instead of per value."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime("%Y-%m-%dT%H:%M:%S").fillna("")
+    if pd.api.types.is_float_dtype(series):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        out = np.char.mod("%.10g", values).astype(object)
+        out[np.isnan(values)] = ""
+        return pd.Series(out, index=series.index)
+    if pd.api.types.is_object_dtype(series):
+        # Mixed Python objects keep the scalar rules
+        return series.map(canonicalize)
+    return series.astype(STRING_DTYPE).str.strip().fillna("")
+
+def copy_dataframe(conn, df, table_name):
+    """Load df into table_name with COPY through the raw psycopg2 cursor."""
+    quote = conn.dialect.identifier_preparer.quote
+    buffer = BytesIO()
+    df.to_csv(buffer, index=False, header=False, na_rep='\\N', encoding='utf-8')
+    buffer.seek(0)
+    
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table_name} ({', '.join(quote(c) for c in df.columns)}) "
+            f"FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+def ensure_sync_meta(engine, schema_name):
+    """Create the table holding one sheet digest per synced sheet."""
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {schema_name}.{SYNC_META_TABLE} (
+              sheet_name TEXT PRIMARY KEY,
+              sheet_hash TEXT NOT NULL,
+              synced_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+        """))
+
+def sheet_digest(df, keys):
+    """Fingerprint of a cleaned sheet: conflict keys, column names and every cell."""
+    digest = hashlib.sha256("|".join([*keys, "", *df.columns]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def schema_ready(table, constraint_name):
+    """True when a reflected table already has everything the DDL steps would add."""
+    cols = table.c
+    return (
+        {'created_at', 'updated_at', 'row_hash'} <= set(cols.keys())
+        and cols.updated_at.server_default is not None
+        and isinstance(cols.row_hash.type, sqlalchemy.BigInteger)
+        and any(c.name == constraint_name for c in table.constraints)
+    )
+
+def reflect_tables(engine, schema_name, table_names):
+    """Reflect the target tables in one catalog pass; tables not yet created are skipped."""
+    wanted = set(table_names)
+    metadata = MetaData(schema=schema_name)
+    metadata.reflect(bind=engine, only=lambda name, _: name in wanted)
+    return metadata
+
+def process_sheet(engine, sheet_name, df, schema_name, metadata=None):
+    """Process a single Excel sheet and sync with database.
+    
+    metadata is the MetaData from reflect_tables(); it is reflected here for
+    this one table when not provided.
+    """
     start_time = time.time()
     logger.info(f"▶ Processing sheet '{sheet_name}'")
     
-    # 1) Normalize column names (spaces to underscores, lowercase)
-    df.columns = (
-        df.columns
-        .str.strip()
-        .str.replace(' ', '_', regex=False)
-        .str.lower()
-    )
+    # 1) Normalize column names (spaces to underscores, lowercase) in one pass,
+    # no intermediate Index objects; str() keeps numeric headers from becoming NaN
+    df.columns = [str(c).strip().replace(' ', '_').lower() for c in df.columns]
     
     # 2) Log detected data types
     logger.info(f"Detected dtypes for '{sheet_name}':\n{df.dtypes}")
@@ -150,12 +243,9 @@ def process_sheet(engine, sheet_name, df, schema_name):
     
     # Find rows that would be dropped
     before = len(df)
-    mask_na = df[keys].isna().any(axis=1)
-    mask_empty = pd.DataFrame(False, index=df.index, columns=['empty'])
-    for key in keys:
-        mask_empty['empty'] |= (df[key] == "")
-    
-    rows_to_drop = mask_na | mask_empty['empty']
+    # NA keys become "" so one array comparison flags both missing and blank
+    key_values = df[keys].fillna("").to_numpy(dtype=object)
+    rows_to_drop = pd.Series((key_values == "").any(axis=1), index=df.index)
     
     # If rows will be dropped, save them to CSV for inspection
     if rows_to_drop.any():
@@ -174,141 +264,267 @@ def process_sheet(engine, sheet_name, df, schema_name):
             key_values = {k: f"'{row[k]}'" if pd.notna(row[k]) else 'NULL' for k in keys}
             logger.info(f"  Row {idx}: {key_values}")
     
-    # Drop rows with missing conflict keys
-    df = df.dropna(subset=keys)
-    for key in keys:
-        df = df[df[key] != ""]
+    # Drop rows with missing conflict keys (same mask, one filter)
+    df = df[~rows_to_drop]
     dropped = before - len(df)
     if dropped:
         logger.warning(f"Dropped {dropped} rows due to missing conflict keys: {keys}")
     
+    # 5a) Skip hashing and sync entirely when the sheet matches the last synced digest
+    if metadata is None:
+        ensure_sync_meta(engine, schema_name)
+        metadata = reflect_tables(engine, schema_name, [sheet_name])
+    table = metadata.tables.get(f"{schema_name}.{sheet_name}")
+    table_exists = table is not None
+    
+    sheet_hash = sheet_digest(df, keys)
+    if table_exists:
+        with engine.connect() as conn:
+            stored_hash = conn.execute(
+                text(f"SELECT sheet_hash FROM {schema_name}.{SYNC_META_TABLE} WHERE sheet_name = :sheet"),
+                {"sheet": sheet_name}
+            ).scalar()
+        if stored_hash == sheet_hash:
+            logger.info(f"⏭ Sheet '{sheet_name}' unchanged since last sync; skipping")
+            return
+    
     # 6) Calculate row hash for change detection
     immutable_cols = ('created_at', 'updated_at', 'row_hash')
     data_cols = [c for c in df.columns if c not in immutable_cols]
-    df['row_hash'] = df.apply(
-        lambda row: hashlib.md5(
-            "|".join(canonicalize(row[c]) for c in data_cols).encode("utf-8")
-        ).hexdigest(),
-        axis=1
-    )
+    # canonicalize, then one vectorized 64-bit hash over the columns (stored as BIGINT)
+    canonical = pd.DataFrame({c: canonicalize_series(df[c]) for c in data_cols}, index=df.index)
+    hashes = pd.util.hash_pandas_object(canonical, index=False)
+    df['row_hash'] = hashes.to_numpy().view('int64')
     
-    # 7) Add updated_at timestamp
-    df['updated_at'] = datetime.now()
+    # 7) updated_at is stamped by Postgres (column DEFAULT on insert, now() on update)
+    df = df.drop(columns='updated_at', errors='ignore')
     
     # 8) Check for duplicate hashes
     dup = df['row_hash'].duplicated().sum()
     if dup:
         logger.warning(f"{dup} duplicate row_hash values in '{sheet_name}'")
     
-    # 9) Check if table exists
-    inspector = inspect(engine)
-    table_exists = inspector.has_table(sheet_name, schema=schema_name)
-    
     with engine.begin() as conn:
         # Set schema search path
         conn.execute(text(f"SET search_path TO {schema_name}"))
         
-        # 10) Create table if it doesn't exist
-        if not table_exists:
-            df.head(0).to_sql(
-                name=sheet_name,
-                con=conn,
-                schema=schema_name,
-                if_exists='append',
-                index=False
-            )
-            logger.info(f"✓ Created table '{schema_name}.{sheet_name}'")
-        
-        # 11) Ensure audit columns exist
-        conn.execute(text(f"""
-            ALTER TABLE {schema_name}.{sheet_name}
-              ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
-              ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ,
-              ADD COLUMN IF NOT EXISTS row_hash TEXT;
-            ALTER TABLE {schema_name}.{sheet_name}
-              ALTER COLUMN updated_at DROP DEFAULT;
-        """))
-        
-        # 12) Create unique constraint if it doesn't exist
+        # 10-12) DDL only when the reflected table is missing something
         constraint_name = f"uq_{sheet_name}_{'_'.join(keys)}"
         cols_list = ", ".join(keys)
-        conn.execute(text(f"""
-            DO $$ BEGIN
-              IF NOT EXISTS (
-                SELECT 1 FROM pg_constraint
-                WHERE conrelid = '{schema_name}.{sheet_name}'::regclass
-                  AND conname = '{constraint_name}'
-              ) THEN
+        needs_ddl = not table_exists or not schema_ready(table, constraint_name)
+        if needs_ddl:
+            # 10) Create table if it doesn't exist
+            if not table_exists:
+                df.head(0).to_sql(
+                    name=sheet_name,
+                    con=conn,
+                    schema=schema_name,
+                    if_exists='append',
+                    index=False
+                )
+                logger.info(f"✓ Created table '{schema_name}.{sheet_name}'")
+        
+            # 11) Ensure audit columns exist
+            conn.execute(text(f"""
                 ALTER TABLE {schema_name}.{sheet_name}
-                  ADD CONSTRAINT {constraint_name} UNIQUE ({cols_list});
-              END IF;
-            END $$;
-        """))
+                  ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                  ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ,
+                  ADD COLUMN IF NOT EXISTS row_hash BIGINT;
+                ALTER TABLE {schema_name}.{sheet_name}
+                  ALTER COLUMN updated_at SET DEFAULT now();
+            """))
         
-        # 13) Reflect table metadata for upsert
-        metadata = MetaData()
-        table = Table(sheet_name, metadata, autoload_with=conn, schema=schema_name)
+            # 11a) Migrate a legacy TEXT (md5/hex) row_hash to BIGINT; rows rehash on this run
+            conn.execute(text(f"""
+                DO $$ BEGIN
+                  IF EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_schema = '{schema_name}'
+                      AND table_name = '{sheet_name}'
+                      AND column_name = 'row_hash'
+                      AND data_type <> 'bigint'
+                  ) THEN
+                    ALTER TABLE {schema_name}.{sheet_name}
+                      ALTER COLUMN row_hash TYPE BIGINT USING NULL;
+                  END IF;
+                END $$;
+            """))
         
-        # 14) Convert NaN to None for proper NULL handling
-        df = df.where(pd.notna(df), None)
+            # 12) Create unique constraint if it doesn't exist
+            conn.execute(text(f"""
+                DO $$ BEGIN
+                  IF NOT EXISTS (
+                    SELECT 1 FROM pg_constraint
+                    WHERE conrelid = '{schema_name}.{sheet_name}'::regclass
+                      AND conname = '{constraint_name}'
+                  ) THEN
+                    ALTER TABLE {schema_name}.{sheet_name}
+                      ADD CONSTRAINT {constraint_name} UNIQUE ({cols_list});
+                  END IF;
+                END $$;
+            """))
         
-        # 15) Prepare upsert statement
-        records = df.to_dict(orient='records')
-        stmt = insert(table).values(records)
+        # 13) Re-reflect after DDL so the upsert sees the new columns/types
+        if needs_ddl:
+            table = Table(sheet_name, metadata, autoload_with=conn, schema=schema_name,
+                          extend_existing=True)
         
-        # Define columns to update (exclude keys and created_at)
-        update_cols = {
-            c.name: stmt.excluded[c.name]
+        # 14) One ON CONFLICT clause shared by both load paths
+        # (exclude keys and created_at; only columns present in the sheet)
+        quote = conn.dialect.identifier_preparer.quote
+        target = f"{schema_name}.{sheet_name}"
+        cols = ", ".join(quote(c) for c in df.columns)
+        set_list = ",\n              ".join(
+            f"{quote(c.name)} = EXCLUDED.{quote(c.name)}"
             for c in table.columns
-            if c.name not in (*keys, 'created_at')
-        }
-        update_cols['updated_at'] = text('now()')
-        
-        # 16) Execute upsert with change detection
-        upsert = stmt.on_conflict_do_update(
-            index_elements=keys,
-            set_=update_cols,
-            where=(table.c.row_hash != stmt.excluded.row_hash)
+            if c.name in df.columns and c.name not in (*keys, 'created_at', 'updated_at')
         )
-        result = conn.execute(upsert)
-        logger.info(f"Upserted {result.rowcount} rows (only changed data)")
+        on_conflict = f"""
+            ON CONFLICT ({", ".join(quote(k) for k in keys)}) DO UPDATE
+              SET {set_list},
+              updated_at = now()
+            WHERE t.row_hash IS DISTINCT FROM EXCLUDED.row_hash
+        """
         
-        # 17) Delete stale rows not in source
-        incoming_hashes = tuple(df['row_hash'].unique())
-        if incoming_hashes:
+        if len(df) > COPY_THRESHOLD:
+            # 15) Large sheet: COPY into a temp stage, then one INSERT ... SELECT
+            stage = f"stg_{sheet_name}"
+            conn.execute(text(f"""
+                CREATE TEMP TABLE {stage}
+                  (LIKE {target} INCLUDING DEFAULTS)
+                  ON COMMIT DROP
+            """))
+            copy_dataframe(conn, df, stage)
+            
+            # 16) Execute upsert with change detection
+            upserted = conn.execute(text(
+                f"INSERT INTO {target} AS t ({cols}) SELECT {cols} FROM {stage} {on_conflict}"
+            )).rowcount
+        else:
+            # 15) Small sheet: positional tuples straight into execute_values (no
+            # per-row dicts); NaN/NaT/NA -> None only here, COPY writes them as NULL
+            rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+            
+            # 16) Execute upsert with change detection; fetch=True collects RETURNING
+            # across every page, since rowcount only covers the last one
+            cursor = conn.connection.cursor()
+            try:
+                returned = execute_values(
+                    cursor,
+                    f"INSERT INTO {target} AS t ({cols}) VALUES %s {on_conflict} RETURNING 1",
+                    rows,
+                    page_size=UPSERT_BATCH_SIZE,
+                    fetch=True
+                )
+            finally:
+                cursor.close()
+            upserted = len(returned)
+        logger.info(f"Upserted {upserted} rows (only changed data)")
+        
+        # 17) Delete stale rows not in source. The upsert has just hashed every
+        # incoming row, so a NULL row_hash (left by the 11a migration) is stale too
+        deleted = 0
+        if len(df) > COPY_THRESHOLD:
+            # Anti-join against the stage that was just loaded
+            deleted = conn.execute(text(f"""
+                DELETE FROM {schema_name}.{sheet_name} t
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM {stage} s WHERE s.row_hash = t.row_hash
+                  )
+            """)).rowcount
+        elif not df.empty:
+            # One array parameter instead of an N-item IN list
             delete_stmt = text(f"""
                 DELETE FROM {schema_name}.{sheet_name}
-                WHERE row_hash IS NOT NULL
-                  AND row_hash NOT IN :hashes
-            """).bindparams(hashes=incoming_hashes)
-            deleted = conn.execute(delete_stmt).rowcount
-            if deleted > 0:
-                logger.info(f"🗑️ Deleted {deleted} stale rows")
+                WHERE row_hash IS NULL
+                   OR row_hash <> ALL(:hashes)
+            """)
+            deleted = conn.execute(delete_stmt, {"hashes": df['row_hash'].unique().tolist()}).rowcount
+        if deleted > 0:
+            logger.info(f"🗑️ Deleted {deleted} stale rows")
+        
+        # 18) Record the digest so an unchanged sheet is skipped next run
+        conn.execute(text(f"""
+            INSERT INTO {schema_name}.{SYNC_META_TABLE} (sheet_name, sheet_hash)
+            VALUES (:sheet, :sheet_hash)
+            ON CONFLICT (sheet_name) DO UPDATE
+              SET sheet_hash = EXCLUDED.sheet_hash,
+                  synced_at = now()
+        """), {"sheet": sheet_name, "sheet_hash": sheet_hash})
     
     elapsed = time.time() - start_time
     logger.info(f"✔ Finished '{sheet_name}' in {elapsed:.2f}s\n")
 
+def _process_sheet_worker(database_url, excel_file, sheet_name, schema_name, metadata):
+    """Process-pool entry point: parse and sync one sheet in its own interpreter.
+    
+    Engines can't cross process boundaries, so each worker builds a NullPool
+    engine from the URL; the workbook is opened here so no DataFrame is pickled.
+    """
+    engine = sqlalchemy.create_engine(database_url, poolclass=NullPool)
+    try:
+        df = pd.read_excel(excel_file, sheet_name=sheet_name, engine=EXCEL_ENGINE)
+        if df.empty:
+            logger.warning(f"Sheet '{sheet_name}' is empty; skipping")
+            return
+        process_sheet(engine, sheet_name, df, schema_name, metadata)
+    finally:
+        engine.dispose()
+
 def process_excel_tabs(engine, excel_file, sheet_list, schema_name):
     """Process multiple Excel sheets from a file."""
     try:
-        excel = pd.ExcelFile(excel_file)
+        excel = pd.ExcelFile(excel_file, engine=EXCEL_ENGINE)
     except Exception as e:
         logger.error(f"Cannot open Excel file '{excel_file}': {e}")
         sys.exit(1)
     
-    # Process each requested sheet
-    for sheet in sheet_list:
+    # Reflect every target table once up front instead of per sheet
+    ensure_sync_meta(engine, schema_name)
+    metadata = reflect_tables(engine, schema_name, sheet_list)
+    
+    # Collapse duplicates so two workers never write the same table
+    sheets = []
+    for sheet in dict.fromkeys(sheet_list):
         if sheet not in excel.sheet_names:
             logger.warning(f"Sheet '{sheet}' not found in Excel file; skipping")
             logger.info(f"Available sheets: {excel.sheet_names}")
             continue
-        
-        df = excel.parse(sheet)
-        if df.empty:
-            logger.warning(f"Sheet '{sheet}' is empty; skipping")
-            continue
+        sheets.append(sheet)
+    
+    if len(sheets) <= 1 or MAX_WORKERS <= 1:
+        # Process each requested sheet sequentially
+        for sheet in sheets:
+            df = excel.parse(sheet)
+            if df.empty:
+                logger.warning(f"Sheet '{sheet}' is empty; skipping")
+                continue
             
-        process_sheet(engine, sheet, df, schema_name)
+            process_sheet(engine, sheet, df, schema_name, metadata)
+        return
+    
+    # Parsing and hashing are CPU-bound and hold the GIL, so each sheet gets a process
+    workers = min(MAX_WORKERS, len(sheets))
+    logger.info(f"Processing {len(sheets)} sheets in parallel ({workers} workers)")
+    database_url = engine.url.render_as_string(hide_password=False)
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context("spawn")) as executor:
+        future_to_sheet = {
+            executor.submit(_process_sheet_worker, database_url, excel_file,
+                            sheet, schema_name, metadata): sheet
+            for sheet in sheets
+        }
+        for future in as_completed(future_to_sheet):
+            sheet = future_to_sheet[future]
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"❌ Sheet '{sheet}' failed: {e}")
+                failed.append(sheet)
+    
+    if failed:
+        sys.exit(1)
 
 def main():
     """Main execution function."""
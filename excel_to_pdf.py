@@ -2,9 +2,10 @@ import os
 import pandas as pd
 from openpyxl import load_workbook
 from openpyxl.drawing.image import Image
-import matplotlib.pyplot as plt
-import matplotlib.backends.backend_pdf
-from matplotlib.backends.backend_pdf import PdfPages
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 import seaborn as sns
 from dotenv import load_dotenv
 import logging
@@ -17,6 +18,13 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Excel reader: Rust-backed calamine when installed, openpyxl otherwise
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"
+
 def setup_directories(base_path, analysts):
     """Create directories for each analyst if they don't exist"""
     directories = {}
@@ -27,37 +35,36 @@ def setup_directories(base_path, analysts):
         logger.info(f"Directory ready: {analyst_path}")
     return directories
 
-def excel_to_pdf_simple(excel_file_path, sheet_name, output_pdf_path):
-    """Convert Excel sheet to PDF using pandas and matplotlib (simple tables)"""
+def excel_to_pdf_simple(df, sheet_name, output_pdf_path):
+    """Convert an already-loaded sheet DataFrame to PDF using ReportLab (simple tables, paginated)"""
     try:
-        # Read the Excel sheet
-        df = pd.read_excel(excel_file_path, sheet_name=sheet_name)
+        # Create PDF (A4 landscape); Platypus flows the table across pages
+        doc = SimpleDocTemplate(output_pdf_path, pagesize=landscape(A4))
+        styles = getSampleStyleSheet()
+        title = Paragraph(f'Analysis Report - {sheet_name.title()}', styles['Title'])
         
-        # Create PDF
-        with PdfPages(output_pdf_path) as pdf:
-            fig, ax = plt.subplots(figsize=(11.69, 8.27))  # A4 landscape
-            ax.axis('tight')
-            ax.axis('off')
-            
-            # Create table
-            table = ax.table(cellText=df.values, 
-                           colLabels=df.columns,
-                           cellLoc='center',
-                           loc='center')
-            
-            # Style the table
-            table.auto_set_font_size(False)
-            table.set_fontsize(8)
-            table.scale(1.2, 1.5)
-            
-            # Style header
-            for i in range(len(df.columns)):
-                table[(0, i)].set_facecolor('#40466e')
-                table[(0, i)].set_text_props(weight='bold', color='white')
-            
-            plt.title(f'Analysis Report - {sheet_name.title()}', fontsize=16, fontweight='bold', pad=20)
-            pdf.savefig(fig, bbox_inches='tight')
-            plt.close()
+        # Create table (header row repeats on every page); blanks instead of 'nan'
+        cells = df.astype(str).where(df.notna(), '')
+        data = [[str(c) for c in df.columns]] + cells.values.tolist()
+        
+        # Equal column widths across the frame so wide sheets stay on the page,
+        # with a font that shrinks as the column count grows
+        n_cols = max(len(df.columns), 1)
+        font_size = max(6, min(9, 100 // n_cols))
+        table = Table(data, colWidths=[doc.width / n_cols] * n_cols, repeatRows=1)
+        
+        # Style the table and header
+        table.setStyle(TableStyle([
+            ('FONTSIZE', (0, 0), (-1, -1), font_size),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('GRID', (0, 0), (-1, -1), 0.25, colors.black),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#40466e')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ]))
+        
+        doc.build([title, Spacer(1, 12), table])
             
         logger.info(f"Successfully created PDF: {output_pdf_path}")
         return True
@@ -66,43 +73,72 @@ def excel_to_pdf_simple(excel_file_path, sheet_name, output_pdf_path):
         logger.error(f"Error converting {sheet_name} to PDF: {str(e)}")
         return False
 
-def excel_to_pdf_advanced(excel_file_path, sheet_name, output_pdf_path):
+def excel_to_pdf_fallback(excel_file, sheet_name, output_pdf_path):
+    """Parse one sheet from the already-open pd.ExcelFile and convert it with the simple method"""
+    try:
+        df = excel_file.parse(sheet_name)
+    except Exception as e:
+        logger.error(f"Error reading sheet {sheet_name}: {str(e)}")
+        return False
+    return excel_to_pdf_simple(df, sheet_name, output_pdf_path)
+
+def excel_to_pdf_advanced(excel_file_path, sheet_name, output_pdf_path, excel_file):
     """Convert Excel sheet to PDF preserving formatting (requires win32com - Windows only)"""
+    return excel_to_pdf_batch(excel_file_path, [sheet_name], [output_pdf_path], excel_file) == 1
+
+def excel_to_pdf_batch(excel_file_path, sheet_names, output_paths, excel_file):
+    """Convert several sheets to PDF in one Excel session (requires win32com - Windows only).
+    Returns the number of sheets converted; falls back to the simple method per sheet,
+    parsing only those sheets from the open pd.ExcelFile."""
     try:
         import win32com.client as win32
-        
-        # Convert to absolute path
-        excel_file_path = os.path.abspath(excel_file_path)
-        output_pdf_path = os.path.abspath(output_pdf_path)
-        
-        # Open Excel application
+    except ImportError:
+        logger.warning("win32com not available. Using simple PDF conversion method.")
+        return sum(excel_to_pdf_fallback(excel_file, name, out)
+                   for name, out in zip(sheet_names, output_paths))
+    
+    success_count = 0
+    pending = list(zip(sheet_names, output_paths))
+    exported = 0
+    excel_app = None
+    workbook = None
+    try:
+        # Open Excel application and the workbook once for all sheets
         excel_app = win32.Dispatch("Excel.Application")
         excel_app.Visible = False
         excel_app.DisplayAlerts = False
+        workbook = excel_app.Workbooks.Open(os.path.abspath(excel_file_path))
         
-        # Open workbook
-        workbook = excel_app.Workbooks.Open(excel_file_path)
-        
-        # Select the specific sheet
-        worksheet = workbook.Sheets(sheet_name)
-        
-        # Export to PDF
-        worksheet.ExportAsFixedFormat(0, output_pdf_path)
-        
-        # Close workbook and quit Excel
-        workbook.Close(False)
-        excel_app.Quit()
-        
-        logger.info(f"Successfully created PDF with formatting: {output_pdf_path}")
-        return True
-        
-    except ImportError:
-        logger.warning("win32com not available. Using simple PDF conversion method.")
-        return excel_to_pdf_simple(excel_file_path, sheet_name, output_pdf_path)
+        # Export each sheet to PDF
+        for sheet_name, output_pdf_path in pending:
+            try:
+                workbook.Sheets(sheet_name).ExportAsFixedFormat(0, os.path.abspath(output_pdf_path))
+                logger.info(f"Successfully created PDF with formatting: {output_pdf_path}")
+                success_count += 1
+            except Exception as e:
+                logger.error(f"Error with advanced PDF conversion for {sheet_name}: {str(e)}")
+                # Fallback to simple method
+                if excel_to_pdf_fallback(excel_file, sheet_name, output_pdf_path):
+                    success_count += 1
+            exported += 1
+            
     except Exception as e:
-        logger.error(f"Error with advanced PDF conversion for {sheet_name}: {str(e)}")
-        # Fallback to simple method
-        return excel_to_pdf_simple(excel_file_path, sheet_name, output_pdf_path)
+        logger.error(f"Error starting Excel for advanced PDF conversion: {str(e)}")
+        # Fallback to simple method for whatever was not exported
+        for sheet_name, output_pdf_path in pending[exported:]:
+            if excel_to_pdf_fallback(excel_file, sheet_name, output_pdf_path):
+                success_count += 1
+    finally:
+        # Close workbook and quit Excel even if an export failed
+        if workbook is not None:
+            try:
+                workbook.Close(False)
+            except Exception:
+                pass
+        if excel_app is not None:
+            excel_app.Quit()
+    
+    return success_count
 
 def main():
     # Get environment variables
@@ -133,18 +169,19 @@ def main():
     # Setup directories for each analyst
     directories = setup_directories(base_pdf_path, sheet_names)
     
-    # Load the Excel file to check available sheets
+    # Load the Excel file once to check available sheets
     try:
-        excel_file = pd.ExcelFile(excel_file_path)
+        excel_file = pd.ExcelFile(excel_file_path, engine=EXCEL_ENGINE)
         available_sheets = excel_file.sheet_names
         logger.info(f"Available sheets in Excel file: {available_sheets}")
     except Exception as e:
         logger.error(f"Error reading Excel file: {str(e)}")
         return
     
-    # Process each sheet
-    success_count = 0
+    # Collect each sheet and its output PDF path
     total_count = len(sheet_names)
+    batch_sheets = []
+    output_paths = []
     
     for sheet_name in sheet_names:
         if sheet_name not in available_sheets:
@@ -154,13 +191,14 @@ def main():
         # Create output PDF path
         analyst_folder = directories[sheet_name]
         pdf_filename = f"{sheet_name}_analysis_report.pdf"
-        output_pdf_path = os.path.join(analyst_folder, pdf_filename)
-        
-        logger.info(f"Converting sheet '{sheet_name}' to PDF...")
-        
-        # Try advanced method first (Windows with Excel), fallback to simple method
-        if excel_to_pdf_advanced(excel_file_path, sheet_name, output_pdf_path):
-            success_count += 1
+        batch_sheets.append(sheet_name)
+        output_paths.append(os.path.join(analyst_folder, pdf_filename))
+    
+    logger.info(f"Converting sheets {batch_sheets} to PDF...")
+    
+    # Try advanced method first (Windows with Excel, one session), fallback to simple
+    # method; sheets are parsed from the open workbook only when they fall back
+    success_count = excel_to_pdf_batch(excel_file_path, batch_sheets, output_paths, excel_file)
     
     # Summary
     logger.info(f"Conversion complete: {success_count}/{total_count} sheets successfully converted to PDF")
@@ -1,18 +1,31 @@
 import os
+import numpy as np
 import pandas as pd
 from openpyxl import load_workbook
 from openpyxl.drawing.image import Image
-import matplotlib.pyplot as plt
-import matplotlib.backends.backend_pdf
-from matplotlib.backends.backend_pdf import PdfPages
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, PageBreak
 import seaborn as sns
 from dotenv import load_dotenv
 import logging
 from pathlib import Path
 from datetime import datetime
 import traceback
+import time
 import json
 import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Excel COM automation (Windows with Excel installed); probed once at import
+try:
+    import win32com.client as win32
+    from pythoncom import CoInitialize, CoUninitialize
+    HAVE_WIN32 = True
+except ImportError:
+    HAVE_WIN32 = False
 
 # Load environment variables
 load_dotenv()
@@ -35,11 +48,17 @@ def setup_logging():
     return logger
 
 class ExcelToPDFConverter:
-    def __init__(self):
+    def __init__(self, config=None):
         self.logger = logging.getLogger(__name__)
         self.conversion_results = []
-        self.start_time = datetime.now()
-        self.config = self._load_and_validate_config()
+        self.start_t0 = time.perf_counter()
+        # Pool workers receive the parent's already-validated config
+        self.config = config if config is not None else self._load_and_validate_config()
+        self._workbook = None
+        self._excel_app = None
+        self._workbook_com = None
+        self._com_sheet_names = set()
+        self._com_initialized = False
         
     def _load_and_validate_config(self):
         """Load and validate all configuration from environment variables"""
@@ -49,6 +68,8 @@ class ExcelToPDFConverter:
             'base_pdf_path': os.getenv('SHEET_CONVERTED_PDF_PATH'),
             'max_retries': int(os.getenv('MAX_CONVERSION_RETRIES', '3')),
             'timeout_seconds': int(os.getenv('CONVERSION_TIMEOUT_SECONDS', '300')),
+            'max_workers': int(os.getenv('MAX_CONVERSION_WORKERS', str(os.cpu_count() or 1))),
+            'pretty_reports': os.getenv('REPORT_PRETTY', 'false').lower() in ('1', 'true', 'yes'),
         }
         
         # Validate configuration
@@ -92,14 +113,9 @@ class ExcelToPDFConverter:
                 directories[analyst] = analyst_path
                 self.logger.info(f"Directory ready: {analyst_path}")
                 
-                # Test write permissions
-                test_file = os.path.join(analyst_path, "write_test.tmp")
-                try:
-                    with open(test_file, 'w') as f:
-                        f.write("test")
-                    os.remove(test_file)
-                except Exception as e:
-                    raise PermissionError(f"Cannot write to directory {analyst_path}: {str(e)}")
+                # Check write permissions (one access() call, no temp file churn)
+                if not os.access(analyst_path, os.W_OK):
+                    raise PermissionError(f"Cannot write to directory {analyst_path}")
                     
         except Exception as e:
             self.logger.error(f"Error setting up directories: {str(e)}")
@@ -107,125 +123,172 @@ class ExcelToPDFConverter:
             
         return directories
 
+    def _get_workbook(self):
+        """Open the workbook once (read_only) and reuse the handle for every sheet"""
+        if self._workbook is None:
+            # read_only streams rows from the archive instead of building every Cell object
+            self._workbook = load_workbook(self.config['excel_file_path'], data_only=True, read_only=True)
+        return self._workbook
+
+    def _close_workbook(self):
+        """Release the ZIP handle held open by read_only mode"""
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+
+    def _is_legacy_xls(self):
+        """True for .xls workbooks, which openpyxl cannot open"""
+        return self.config['excel_file_path'].lower().endswith('.xls')
+
     def get_available_sheets(self):
         """Get list of available sheets in the Excel file"""
         try:
-            excel_file = pd.ExcelFile(self.config['excel_file_path'])
-            available_sheets = excel_file.sheet_names
+            if self._is_legacy_xls():
+                available_sheets = pd.ExcelFile(self.config['excel_file_path']).sheet_names
+            else:
+                available_sheets = self._get_workbook().sheetnames
             self.logger.info(f"Available sheets in Excel file: {available_sheets}")
             return available_sheets
         except Exception as e:
             self.logger.error(f"Error reading Excel file structure: {str(e)}")
             raise
 
+    def _read_sheet_openpyxl(self, sheet_name):
+        """Read a sheet's used range as (headers, rows of strings) from the shared .xlsx workbook"""
+        # Use the shared read_only workbook instead of re-parsing the file per sheet
+        workbook = self._get_workbook()
+        if sheet_name not in workbook.sheetnames:
+            raise ValueError(f"Sheet '{sheet_name}' not found")
+            
+        worksheet = workbook[sheet_name]
+        # read_only trusts the sheet's <dimension> tag, which can be stale and cut
+        # off rows/columns; drop it so iter_rows reads every row that exists
+        worksheet.reset_dimensions()
+        
+        # One streaming pass: the first non-empty row is the header row,
+        # later rows are kept only if they have at least some data, and the
+        # used column range is tracked as rows go by (max_row/max_column are
+        # unreliable in read_only)
+        header_row = None
+        raw_rows = []
+        min_col, max_col = None, -1
+        for row in worksheet.iter_rows(values_only=True):
+            filled = [i for i, v in enumerate(row) if v is not None]
+            if not filled:
+                continue
+            if min_col is None or filled[0] < min_col:
+                min_col = filled[0]
+            if filled[-1] > max_col:
+                max_col = filled[-1]
+            if header_row is None:
+                header_row = row
+            else:
+                raw_rows.append(row)
+        
+        if header_row is None:
+            raise ValueError(f"No data found in sheet '{sheet_name}'")
+        
+        # Extract data preserving the layout (empty leading/trailing columns
+        # trimmed), empty cells as empty strings
+        width = max_col + 1 - min_col
+        headers = [str(v) if v is not None else "" for v in header_row[min_col:max_col + 1]]
+        headers += [""] * (width - len(headers))
+        data = []
+        for row in raw_rows:
+            row_data = ["" if v is None else str(v) for v in row[min_col:max_col + 1]]
+            row_data += [""] * (width - len(row_data))
+            data.append(row_data)
+        return headers, data
+
+    def _read_sheet_pandas(self, sheet_name):
+        """Read a sheet's used range as (headers, rows of strings) through pandas (legacy .xls)"""
+        df = pd.read_excel(self.config['excel_file_path'], sheet_name=sheet_name, header=None, dtype=object)
+        arr = df.to_numpy(dtype=object)
+        mask = pd.notna(arr)
+        if not mask.any():
+            raise ValueError(f"No data found in sheet '{sheet_name}'")
+        
+        # Vectorized boundaries: drop empty rows, trim empty leading/trailing columns
+        cols_nonempty = mask.any(axis=0)
+        min_col = cols_nonempty.argmax()
+        max_col = len(cols_nonempty) - cols_nonempty[::-1].argmax()
+        rows_nonempty = mask.any(axis=1)
+        block = arr[rows_nonempty, min_col:max_col]
+        block_mask = mask[rows_nonempty, min_col:max_col]
+        
+        # First non-empty row is the header row; empty cells as empty strings
+        headers = np.where(block_mask[0], block[0].astype(str), "").tolist()
+        data = np.where(block_mask[1:], block[1:].astype(str), "").tolist()
+        return headers, data
+
     def excel_to_pdf_simple(self, sheet_name, output_pdf_path):
         """Convert Excel sheet to PDF using openpyxl to preserve better formatting"""
         try:
             self.logger.debug(f"Starting simple PDF conversion for sheet: {sheet_name}")
             
-            # Use openpyxl to read with better formatting preservation
-            from openpyxl import load_workbook
-            
-            workbook = load_workbook(self.config['excel_file_path'], data_only=True)
-            if sheet_name not in workbook.sheetnames:
-                raise ValueError(f"Sheet '{sheet_name}' not found")
-                
-            worksheet = workbook[sheet_name]
-            
-            # Get the actual used range (skip empty rows/columns)
-            max_row = worksheet.max_row
-            max_col = worksheet.max_column
-            
-            # Find the actual data boundaries (skip empty leading rows/cols)
-            min_row, min_col = 1, 1
-            for row in range(1, max_row + 1):
-                if any(worksheet.cell(row, col).value for col in range(1, max_col + 1)):
-                    min_row = row
-                    break
-            
-            for col in range(1, max_col + 1):
-                if any(worksheet.cell(row, col).value for row in range(min_row, max_row + 1)):
-                    min_col = col
-                    break
-            
-            # Extract data preserving the layout
-            data = []
-            headers = []
-            
-            # Get headers from first row of data
-            for col in range(min_col, max_col + 1):
-                cell_value = worksheet.cell(min_row, col).value
-                headers.append(str(cell_value) if cell_value is not None else "")
-            
-            # Get data rows, preserving empty cells as empty strings
-            for row in range(min_row + 1, max_row + 1):
-                row_data = []
-                has_data = False
-                for col in range(min_col, max_col + 1):
-                    cell_value = worksheet.cell(row, col).value
-                    if cell_value is not None:
-                        row_data.append(str(cell_value))
-                        has_data = True
-                    else:
-                        row_data.append("")
-                
-                # Only add rows that have at least some data
-                if has_data:
-                    data.append(row_data)
+            # openpyxl reads .xlsx only; legacy .xls goes through pandas
+            if self._is_legacy_xls():
+                headers, data = self._read_sheet_pandas(sheet_name)
+            else:
+                headers, data = self._read_sheet_openpyxl(sheet_name)
             
             if not data:
                 raise ValueError(f"No data found in sheet '{sheet_name}'")
             
             self.logger.debug(f"Sheet data loaded: {len(data)} rows, {len(headers)} columns")
             
-            # Create PDF with better layout
-            with PdfPages(output_pdf_path) as pdf:
-                # Handle large datasets by splitting into pages
-                max_rows_per_page = 40  # Reduced for better readability
-                total_pages = (len(data) + max_rows_per_page - 1) // max_rows_per_page
+            # Create PDF with better layout (A4 landscape, one table per page)
+            doc = SimpleDocTemplate(
+                output_pdf_path, pagesize=landscape(A4),
+                leftMargin=36, rightMargin=36, topMargin=36, bottomMargin=36
+            )
+            title_style = ParagraphStyle('ReportTitle', parent=getSampleStyleSheet()['Title'],
+                                         fontSize=14, leading=17, spaceAfter=8)
+            
+            # Handle large datasets by splitting into pages
+            max_rows_per_page = 40  # Reduced for better readability
+            total_pages = (len(data) + max_rows_per_page - 1) // max_rows_per_page
+            
+            # Improved styling: dynamic font size based on columns, equal column
+            # widths, and rows sized so header + 40 rows fit under the title
+            font_size = max(6, min(9, 100 // len(headers)))
+            col_widths = [doc.width / len(headers)] * len(headers)
+            title_height = title_style.leading + title_style.spaceAfter + 24  # frame padding + slack
+            row_height = (doc.height - title_height) / (max_rows_per_page + 1)
+            
+            # One style for every page: header row, grid and alternate row colors
+            table_style = TableStyle([
+                ('FONTSIZE', (0, 0), (-1, -1), font_size),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('TOPPADDING', (0, 0), (-1, -1), 1),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+                ('GRID', (0, 0), (-1, -1), 0.25, colors.black),
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#40466e')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')]),
+            ])
+            
+            story = []
+            for page_num in range(total_pages):
+                start_idx = page_num * max_rows_per_page
+                end_idx = min((page_num + 1) * max_rows_per_page, len(data))
+                page_data = data[start_idx:end_idx]
                 
-                for page_num in range(total_pages):
-                    start_idx = page_num * max_rows_per_page
-                    end_idx = min((page_num + 1) * max_rows_per_page, len(data))
-                    page_data = data[start_idx:end_idx]
-                    
-                    fig, ax = plt.subplots(figsize=(11.69, 8.27))  # A4 landscape
-                    ax.axis('tight')
-                    ax.axis('off')
-                    
-                    # Create table with proper data
-                    table = ax.table(
-                        cellText=page_data,
-                        colLabels=headers,
-                        cellLoc='center',
-                        loc='center'
-                    )
-                    
-                    # Improved styling
-                    table.auto_set_font_size(False)
-                    font_size = max(6, min(9, 100 // len(headers)))  # Dynamic font size based on columns
-                    table.set_fontsize(font_size)
-                    table.scale(1.0, 1.8)  # Better row height
-                    
-                    # Style header row
-                    for i in range(len(headers)):
-                        table[(0, i)].set_facecolor('#40466e')
-                        table[(0, i)].set_text_props(weight='bold', color='white')
-                    
-                    # Alternate row colors for better readability
-                    for i in range(1, len(page_data) + 1):
-                        if i % 2 == 0:
-                            for j in range(len(headers)):
-                                table[(i, j)].set_facecolor('#f0f0f0')
-                    
-                    # Title with page info
-                    title = f'Analysis Report - {sheet_name.title()}'
-                    if total_pages > 1:
-                        title += f' (Page {page_num + 1} of {total_pages})'
-                    plt.title(title, fontsize=14, fontweight='bold', pad=20)
-                    
-                    pdf.savefig(fig, bbox_inches='tight', dpi=300)
-                    plt.close()
+                # Title with page info
+                title = f'Analysis Report - {sheet_name.title()}'
+                if total_pages > 1:
+                    title += f' (Page {page_num + 1} of {total_pages})'
+                story.append(Paragraph(title, title_style))
+                
+                # Create table with proper data
+                story.append(Table([headers] + page_data, colWidths=col_widths,
+                                   rowHeights=row_height, style=table_style))
+                if page_num < total_pages - 1:
+                    story.append(PageBreak())
+            
+            doc.build(story)
             
             self.logger.info(f"Successfully created PDF: {output_pdf_path}")
             return True
@@ -235,66 +298,104 @@ class ExcelToPDFConverter:
             self.logger.debug(f"Full traceback: {traceback.format_exc()}")
             return False
 
-    def excel_to_pdf_advanced(self, sheet_name, output_pdf_path):
-        """Convert Excel sheet to PDF preserving formatting (requires win32com - Windows only)"""
+    def _open_excel(self):
+        """Start one Excel.Application and open the workbook for the whole run (Windows only)"""
+        if not HAVE_WIN32:
+            self.logger.warning("win32com not available. Using simple PDF conversion method.")
+            return
+        
+        # Initialize COM
+        CoInitialize()
+        self._com_initialized = True
+        
         try:
-            import win32com.client as win32
-            from pythoncom import CoInitialize, CoUninitialize
+            # Open Excel application
+            self._excel_app = win32.Dispatch("Excel.Application")
+            self._excel_app.Visible = False
+            self._excel_app.DisplayAlerts = False
+            self._excel_app.ScreenUpdating = False
+            self._excel_app.EnableEvents = False
+            self._excel_app.AskToUpdateLinks = False
+            
+            # Open workbook read-only without refreshing external links, prompting,
+            # or adding it to the recent-files list
+            excel_file_path = os.path.abspath(self.config['excel_file_path'])
+            self._workbook_com = self._excel_app.Workbooks.Open(
+                excel_file_path,
+                UpdateLinks=0,
+                ReadOnly=True,
+                IgnoreReadOnlyRecommended=True,
+                Notify=False,
+                AddToMru=False
+            )
+            
+            # Manual calculation (xlCalculationManual) so exports don't recalculate;
+            # Excel only accepts this once a workbook is open
+            self._excel_app.Calculation = -4135
+            self._com_sheet_names = {ws.Name for ws in self._workbook_com.Worksheets}
+            self.logger.debug(f"Excel session opened for: {excel_file_path}")
             
+        except Exception as e:
+            self.logger.error(f"Error starting Excel for advanced PDF conversion: {str(e)}")
+            self.logger.debug(f"Full traceback: {traceback.format_exc()}")
+            self._close_excel()
+
+    def _close_excel(self):
+        """Close the shared workbook, quit Excel and release COM"""
+        if self._workbook_com is not None:
+            try:
+                self._workbook_com.Close(False)
+            except Exception as e:
+                self.logger.debug(f"Error closing Excel workbook: {str(e)}")
+            self._workbook_com = None
+        if self._excel_app is not None:
+            try:
+                self._excel_app.Quit()
+            except Exception as e:
+                self.logger.debug(f"Error quitting Excel: {str(e)}")
+            self._excel_app = None
+        if self._com_initialized:
+            CoUninitialize()
+            self._com_initialized = False
+
+    def excel_to_pdf_advanced(self, sheet_name, output_pdf_path):
+        """Convert Excel sheet to PDF preserving formatting (requires win32com - Windows only)
+        
+        Uses the Excel session opened once by run(); without one, falls back to the simple method.
+        """
+        if self._workbook_com is None:
+            return self.excel_to_pdf_simple(sheet_name, output_pdf_path)
+        
+        try:
             self.logger.debug(f"Starting advanced PDF conversion for sheet: {sheet_name}")
             
-            # Initialize COM
-            CoInitialize()
+            # Convert to absolute path
+            output_pdf_path = os.path.abspath(output_pdf_path)
             
-            try:
-                # Convert to absolute paths
-                excel_file_path = os.path.abspath(self.config['excel_file_path'])
-                output_pdf_path = os.path.abspath(output_pdf_path)
-                
-                # Open Excel application
-                excel_app = win32.Dispatch("Excel.Application")
-                excel_app.Visible = False
-                excel_app.DisplayAlerts = False
-                excel_app.ScreenUpdating = False
-                
-                # Open workbook
-                workbook = excel_app.Workbooks.Open(excel_file_path, ReadOnly=True)
-                
-                # Verify sheet exists
-                sheet_names = [ws.Name for ws in workbook.Worksheets]
-                if sheet_name not in sheet_names:
-                    raise ValueError(f"Sheet '{sheet_name}' not found in workbook")
-                
-                # Select the specific sheet
-                worksheet = workbook.Sheets(sheet_name)
-                
-                # Check if sheet has data
-                used_range = worksheet.UsedRange
-                if used_range is None:
-                    raise ValueError(f"Sheet '{sheet_name}' has no data")
-                
-                # Export to PDF with simplified parameters (avoiding compatibility issues)
-                worksheet.ExportAsFixedFormat(
-                    Type=0,  # PDF format
-                    Filename=output_pdf_path,
-                    Quality=0,  # 0 = minimum size, 1 = maximum quality
-                    IgnorePrintAreas=False,
-                    OpenAfterPublish=False
-                )
-                
-                # Close workbook and quit Excel
-                workbook.Close(False)
-                excel_app.Quit()
-                
-            finally:
-                CoUninitialize()
+            # Verify sheet exists
+            if sheet_name not in self._com_sheet_names:
+                raise ValueError(f"Sheet '{sheet_name}' not found in workbook")
+            
+            # Select the specific sheet
+            worksheet = self._workbook_com.Sheets(sheet_name)
+            
+            # Check if sheet has data
+            used_range = worksheet.UsedRange
+            if used_range is None:
+                raise ValueError(f"Sheet '{sheet_name}' has no data")
+            
+            # Export to PDF with simplified parameters (avoiding compatibility issues)
+            worksheet.ExportAsFixedFormat(
+                Type=0,  # PDF format
+                Filename=output_pdf_path,
+                Quality=0,  # 0 = minimum size, 1 = maximum quality
+                IgnorePrintAreas=False,
+                OpenAfterPublish=False
+            )
             
             self.logger.info(f"Successfully created PDF with formatting: {output_pdf_path}")
             return True
             
-        except ImportError:
-            self.logger.warning("win32com not available. Using simple PDF conversion method.")
-            return self.excel_to_pdf_simple(sheet_name, output_pdf_path)
         except Exception as e:
             self.logger.error(f"Error with advanced PDF conversion for {sheet_name}: {str(e)}")
             self.logger.debug(f"Full traceback: {traceback.format_exc()}")
@@ -302,20 +403,27 @@ class ExcelToPDFConverter:
             return self.excel_to_pdf_simple(sheet_name, output_pdf_path)
 
     def convert_sheet_with_retry(self, sheet_name, output_pdf_path):
-        """Convert a single sheet with retry logic"""
+        """Convert a single sheet with retry logic; returns (success, error, file_size)"""
         max_retries = self.config['max_retries']
         
+        # Advanced method when the Excel session is open, otherwise straight to simple
+        convert = self.excel_to_pdf_advanced if self._workbook_com is not None else self.excel_to_pdf_simple
+        
         for attempt in range(1, max_retries + 1):
             try:
                 self.logger.info(f"Converting sheet '{sheet_name}' (attempt {attempt}/{max_retries})")
                 
-                # Try advanced method first, fallback to simple
-                success = self.excel_to_pdf_advanced(sheet_name, output_pdf_path)
+                success = convert(sheet_name, output_pdf_path)
                 
-                if success and os.path.exists(output_pdf_path) and os.path.getsize(output_pdf_path) > 0:
-                    file_size = os.path.getsize(output_pdf_path)
+                # One stat call both checks the file exists and gets its size
+                try:
+                    file_size = os.stat(output_pdf_path).st_size if success else 0
+                except FileNotFoundError:
+                    file_size = 0
+                
+                if file_size > 0:
                     self.logger.info(f"Conversion successful. PDF size: {file_size:,} bytes")
-                    return True, None
+                    return True, None, file_size
                 else:
                     raise Exception("PDF file was not created or is empty")
                     
@@ -325,13 +433,34 @@ class ExcelToPDFConverter:
                 
                 if attempt == max_retries:
                     self.logger.error(f"All {max_retries} attempts failed for sheet '{sheet_name}'")
-                    return False, error_msg
+                    return False, error_msg, None
                 else:
                     self.logger.info(f"Retrying in 2 seconds...")
-                    import time
                     time.sleep(2)
         
-        return False, "Maximum retry attempts exceeded"
+        return False, "Maximum retry attempts exceeded", None
+
+    def convert_sheet(self, sheet_name, output_pdf_path):
+        """Convert one sheet (with retries) and return its result record"""
+        t0 = time.perf_counter()
+        
+        # Attempt conversion
+        success, error, file_size = self.convert_sheet_with_retry(sheet_name, output_pdf_path)
+        
+        # Record result
+        result = {
+            'sheet_name': sheet_name,
+            'success': success,
+            'output_path': output_pdf_path,
+            'duration_seconds': time.perf_counter() - t0
+        }
+        
+        if success:
+            result['file_size'] = file_size
+        else:
+            result['error'] = error
+        
+        return result
 
     def generate_report(self, directories):
         """Generate comprehensive success/failure report"""
@@ -347,53 +476,60 @@ class ExcelToPDFConverter:
         
         success_count = sum(1 for result in self.conversion_results if result['success'])
         total_count = len(self.conversion_results)
-        duration = datetime.now() - self.start_time
+        duration_seconds = time.perf_counter() - self.start_t0
+        
+        # Generate text report (assembled in memory, written with one call)
+        parts = [
+            "=" * 80 + "\n",
+            "EXCEL TO PDF CONVERSION REPORT\n",
+            "=" * 80 + "\n",
+            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+            f"Duration: {duration_seconds:.2f} seconds\n",
+            f"Source File: {self.config['excel_file_path']}\n",
+            f"Output Base Path: {self.config['base_pdf_path']}\n",
+            f"Success Rate: {success_count}/{total_count} ({(success_count/total_count*100):.1f}%)\n",
+            "\n",
+        ]
+        
+        if success_count > 0:
+            parts.append("SUCCESSFUL CONVERSIONS:\n" + "-" * 40 + "\n")
+            for result in self.conversion_results:
+                if result['success']:
+                    size_line = f"  File Size: {result['file_size']:,} bytes\n" if result.get('file_size') else ""
+                    parts.append(
+                        f"✓ {result['sheet_name']}\n"
+                        f"  Output: {result['output_path']}\n"
+                        f"  Duration: {result['duration_seconds']:.2f} seconds\n"
+                        f"{size_line}\n"
+                    )
+        
+        if success_count < total_count:
+            parts.append("FAILED CONVERSIONS:\n" + "-" * 40 + "\n")
+            for result in self.conversion_results:
+                if not result['success']:
+                    parts.append(
+                        f"✗ {result['sheet_name']}\n"
+                        f"  Error: {result['error']}\n"
+                        f"  Attempted Output: {result['output_path']}\n"
+                        "\n"
+                    )
+        
+        # Configuration summary
+        parts.append(
+            "CONFIGURATION:\n"
+            + "-" * 40 + "\n"
+            + f"Max Retries: {self.config['max_retries']}\n"
+            + f"Timeout: {self.config['timeout_seconds']} seconds\n"
+            + f"Requested Sheets: {', '.join(self.config['sheet_names'])}\n"
+        )
         
-        # Generate text report
         with open(report_file, 'w', encoding='utf-8') as f:
-            f.write("=" * 80 + "\n")
-            f.write("EXCEL TO PDF CONVERSION REPORT\n")
-            f.write("=" * 80 + "\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Duration: {duration}\n")
-            f.write(f"Source File: {self.config['excel_file_path']}\n")
-            f.write(f"Output Base Path: {self.config['base_pdf_path']}\n")
-            f.write(f"Success Rate: {success_count}/{total_count} ({(success_count/total_count*100):.1f}%)\n")
-            f.write("\n")
-            
-            if success_count > 0:
-                f.write("SUCCESSFUL CONVERSIONS:\n")
-                f.write("-" * 40 + "\n")
-                for result in self.conversion_results:
-                    if result['success']:
-                        f.write(f"✓ {result['sheet_name']}\n")
-                        f.write(f"  Output: {result['output_path']}\n")
-                        f.write(f"  Duration: {result['duration']}\n")
-                        if result.get('file_size'):
-                            f.write(f"  File Size: {result['file_size']:,} bytes\n")
-                        f.write("\n")
-            
-            if success_count < total_count:
-                f.write("FAILED CONVERSIONS:\n")
-                f.write("-" * 40 + "\n")
-                for result in self.conversion_results:
-                    if not result['success']:
-                        f.write(f"✗ {result['sheet_name']}\n")
-                        f.write(f"  Error: {result['error']}\n")
-                        f.write(f"  Attempted Output: {result['output_path']}\n")
-                        f.write("\n")
-            
-            # Configuration summary
-            f.write("CONFIGURATION:\n")
-            f.write("-" * 40 + "\n")
-            f.write(f"Max Retries: {self.config['max_retries']}\n")
-            f.write(f"Timeout: {self.config['timeout_seconds']} seconds\n")
-            f.write(f"Requested Sheets: {', '.join(self.config['sheet_names'])}\n")
+            f.write("".join(parts))
         
         # Generate JSON report
         json_data = {
             'timestamp': datetime.now().isoformat(),
-            'duration_seconds': duration.total_seconds(),
+            'duration_seconds': duration_seconds,
             'source_file': self.config['excel_file_path'],
             'output_base_path': self.config['base_pdf_path'],
             'total_sheets': total_count,
@@ -404,7 +540,8 @@ class ExcelToPDFConverter:
         }
         
         with open(json_report_file, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, indent=2, default=str)
+            # Compact by default; REPORT_PRETTY=true indents for reading by hand
+            json.dump(json_data, f, indent=2 if self.config['pretty_reports'] else None, default=str)
         
         self.logger.info(f"Reports generated:")
         self.logger.info(f"  Text report: {report_file}")
@@ -426,20 +563,25 @@ class ExcelToPDFConverter:
             # Get available sheets
             available_sheets = self.get_available_sheets()
             
-            # Process each requested sheet
+            # Start Excel once for every sheet (no-op without win32com)
+            self._open_excel()
+            
+            # Check each requested sheet and create its output path
+            results = []
+            tasks = []
             for sheet_name in self.config['sheet_names']:
-                start_time = datetime.now()
+                t0 = time.perf_counter()
                 
                 # Check if sheet exists
                 if sheet_name not in available_sheets:
                     error_msg = f"Sheet '{sheet_name}' not found in Excel file. Available: {available_sheets}"
                     self.logger.warning(error_msg)
-                    self.conversion_results.append({
+                    results.append({
                         'sheet_name': sheet_name,
                         'success': False,
                         'error': error_msg,
                         'output_path': 'N/A',
-                        'duration': datetime.now() - start_time
+                        'duration_seconds': time.perf_counter() - t0
                     })
                     continue
                 
@@ -449,23 +591,29 @@ class ExcelToPDFConverter:
                 pdf_filename = f"{sheet_name}_analysis_report_{timestamp}.pdf"
                 output_pdf_path = os.path.join(analyst_folder, pdf_filename)
                 
-                # Attempt conversion
-                success, error = self.convert_sheet_with_retry(sheet_name, output_pdf_path)
-                
-                # Record result
-                result = {
-                    'sheet_name': sheet_name,
-                    'success': success,
-                    'output_path': output_pdf_path,
-                    'duration': datetime.now() - start_time
-                }
-                
-                if success:
-                    result['file_size'] = os.path.getsize(output_pdf_path)
-                else:
-                    result['error'] = error
-                
-                self.conversion_results.append(result)
+                # Reserve the result slot so the report keeps the requested order
+                tasks.append((len(results), sheet_name, output_pdf_path))
+                results.append(None)
+            
+            # The simple path is CPU-bound and independent per sheet, so it gets a
+            # process per sheet; the Excel COM session lives in this process only
+            workers = min(self.config['max_workers'], len(tasks))
+            if self._workbook_com is None and workers > 1:
+                self.logger.info(f"Converting {len(tasks)} sheets in parallel ({workers} workers)")
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=setup_logging) as executor:
+                    converted = executor.map(
+                        _convert_one,
+                        [(self.config, sheet_name, output_pdf_path) for _, sheet_name, output_pdf_path in tasks]
+                    )
+                    for (slot, _, _), result in zip(tasks, converted):
+                        results[slot] = result
+            else:
+                for slot, sheet_name, output_pdf_path in tasks:
+                    results[slot] = self.convert_sheet(sheet_name, output_pdf_path)
+            
+            self.conversion_results.extend(results)
             
             # Generate reports
             text_report, json_report = self.generate_report(directories)
@@ -491,6 +639,22 @@ class ExcelToPDFConverter:
             self.logger.error(f"Critical error in main process: {str(e)}")
             self.logger.debug(f"Full traceback: {traceback.format_exc()}")
             return 3  # Critical error exit code
+        finally:
+            self._close_excel()
+            self._close_workbook()
+
+def _convert_one(args):
+    """Process-pool entry point: convert one sheet in its own interpreter.
+    
+    COM objects and workbook handles can't cross process boundaries, so each
+    worker builds its own converter (simple path) from the parent's config.
+    """
+    config, sheet_name, output_pdf_path = args
+    converter = ExcelToPDFConverter(config)
+    try:
+        return converter.convert_sheet(sheet_name, output_pdf_path)
+    finally:
+        converter._close_workbook()
 
 def main():
     """Entry point with comprehensive error handling"""
@@ -1,8 +1,11 @@
 import csv
+import fnmatch
 import re
 import os
 import sys
-from pathlib import Path
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import chain, islice
 
 # ============================================================================
 # CONFIGURATION - SET YOUR FOLDER PATH HERE
@@ -15,32 +18,85 @@ output_folder_path = r"C:\Users\osmelc\OneDrive - Washington State Department of
 
 # File pattern to match (leave as None to process ALL .txt files)
 file_pattern = "*.txt"  # or "WWU Spend*.txt" to be more specific
+
+# Files converted in parallel (None uses one worker per CPU core)
+max_workers = None
 # ============================================================================
 
+# Patterns used by parse_fixed_width_line, compiled once at import
+_FED_ID_LA = re.compile(r'(\d{9})(?=\s*[A-Z]{2})')
+_FED_ID = re.compile(r'(\d{9})')
+_SUB_OBJ_ANY = re.compile(r'([A-Z]{2})')
+_DOLLAR = re.compile(r'(\d+\.\d{2})')
+_DOLLAR_RAW = re.compile(r'(\d{5,})')
+_YEAR = re.compile(r'(\d{4})$')
+_DIGIT = re.compile(r'\d')
+
+# Whole-line shape: report part, college, firm, Fed ID, sub-object, dollar
+# amount (formatted or raw), optional year. The lookahead + backreferences
+# pin the Fed ID to its first match, as _FED_ID_LA.search would
+_LINE = re.compile(
+    r'(\d)(\d{4})(?=(.*?)(\d{9})(?=\s*[A-Z]{2}))\3\4'
+    r'\s*([A-Z]{2})\s*(?:(\d+\.\d{2})|(\d{5,}))(?:\s+\d{4})?'
+)
+
+# Leading lines used to learn the column layout of each file
+CALIBRATION_LINES = 100
+
+# Parsed rows buffered per csv writerows call
+WRITE_BATCH_ROWS = 4096
+
+# Read buffer for input files
+READ_BUFFER_BYTES = 8 * 1024 * 1024
+
+# Shortest parseable line: 5 leading chars, 9-digit Fed ID, 2-letter
+# sub-object and a 4-char dollar amount ("0.00")
+MIN_LINE_LENGTH = 20
+
+def _is_sub_object(text):
+    """True for exactly two ASCII capital letters, as [A-Z]{2} matches"""
+    return len(text) == 2 and text.isascii() and text.isalpha() and text.isupper()
+
 def parse_fixed_width_line(line):
-    """Parse a single line of fixed-width data into components"""
+    """Parse a single line of fixed-width data into a row tuple in header order"""
     line = line.strip()
     
-    if not line:
+    if len(line) < MIN_LINE_LENGTH:
         return None
     
+    # Well-formed lines are parsed in one match; the field-by-field
+    # searches below handle everything else
+    line_match = _LINE.fullmatch(line)
+    if line_match:
+        (report_part, college_number, firm_name, fed_id,
+         sub_object, dollar_fmt, dollar_raw) = line_match.groups()
+        return (
+            report_part,
+            college_number,
+            firm_name.strip(),
+            fed_id,
+            sub_object,
+            dollar_fmt or f"{dollar_raw[:-2]}.{dollar_raw[-2:]}",
+            line[-4:-2] if line[-4:].isdigit() else "",
+            "13"
+        )
+    
     # Report Part: First digit
     report_part = line[0] if line else ""
     
     # College Number: Next 4 digits
     college_number = line[1:5] if len(line) > 4 else ""
     
-    # Find 9-digit federal ID
-    fed_id_match = re.search(r'(\d{9})(?=\s*[A-Z]{2})', line[5:])
+    # Find 9-digit federal ID (search from position 5 without slicing)
+    fed_id_match = _FED_ID_LA.search(line, 5)
     
     if not fed_id_match:
-        fed_id_match = re.search(r'(\d{9})', line[5:])
+        fed_id_match = _FED_ID.search(line, 5)
         if not fed_id_match:
             return None
     
-    # Adjust position since we started search from position 5
-    fed_id_start = fed_id_match.start(1) + 5
-    fed_id_end = fed_id_match.end(1) + 5
+    fed_id_start = fed_id_match.start(1)
+    fed_id_end = fed_id_match.end(1)
     fed_id = fed_id_match.group(1)
     
     # Firm name is between college number and federal ID
@@ -48,19 +104,18 @@ def parse_fixed_width_line(line):
     
     # After federal ID, find sub-object (2 letters)
     after_fed_id = line[fed_id_end:].strip()
-    sub_object_match = re.match(r'\s*([A-Z]{2})', after_fed_id)
+    sub_object = after_fed_id[:2]
     
-    if not sub_object_match:
-        sub_object_match = re.search(r'([A-Z]{2})', after_fed_id)
+    if not _is_sub_object(sub_object):
+        sub_object_match = _SUB_OBJ_ANY.search(after_fed_id)
         if not sub_object_match:
             return None
-    
-    sub_object = sub_object_match.group(1)
+        sub_object = sub_object_match.group(1)
     
     # Dollar amount
-    dollar_match = re.search(r'(\d+\.\d{2})', after_fed_id)
+    dollar_match = _DOLLAR.search(after_fed_id)
     if not dollar_match:
-        dollar_match = re.search(r'(\d{5,})', after_fed_id)
+        dollar_match = _DOLLAR_RAW.search(after_fed_id)
         if dollar_match:
             amount = dollar_match.group(1)
             if len(amount) >= 3:
@@ -73,7 +128,7 @@ def parse_fixed_width_line(line):
         dollar_amount = dollar_match.group(1)
     
     # Fiscal year - extract first 2 digits from 4-digit year
-    fiscal_year_match = re.search(r'(\d{4})$', line)
+    fiscal_year_match = _YEAR.search(line)
     if fiscal_year_match:
         full_year = fiscal_year_match.group(1)
         fiscal_year = full_year[:2]
@@ -83,16 +138,81 @@ def parse_fixed_width_line(line):
     # Fiscal month
     fiscal_month = "13"
     
-    return {
-        'Report Part': report_part,
-        'College Number': college_number,
-        'Firm Name': firm_name,
-        'Firm Fed ID': fed_id,
-        'Sub-object': sub_object,
-        'Dollar Amount': dollar_amount,
-        'Fiscal Year': fiscal_year,
-        'Fiscal Month': fiscal_month
-    }
+    return (
+        report_part,
+        college_number,
+        firm_name,
+        fed_id,
+        sub_object,
+        dollar_amount,
+        fiscal_year,
+        fiscal_month
+    )
+
+def calibrate_offsets(lines):
+    """Learn the Fed ID, sub-object and dollar-end columns from sample lines"""
+    layouts = Counter()
+    for line in lines:
+        line = line.strip()
+        fed_id_match = _FED_ID_LA.search(line, 5)
+        if not fed_id_match:
+            continue
+        fed_id_end = fed_id_match.end(1)
+        rest = line[fed_id_end:]
+        sub_object_start = fed_id_end + len(rest) - len(rest.lstrip())
+        dollar_match = (_DOLLAR.search(line, sub_object_start + 2)
+                        or _DOLLAR_RAW.search(line, sub_object_start + 2))
+        if dollar_match:
+            layouts[(fed_id_match.start(1), sub_object_start, dollar_match.end(1))] += 1
+    
+    if not layouts:
+        return None
+    return layouts.most_common(1)[0][0]
+
+def _parse_fast(line, offsets):
+    """Slice a stripped line at calibrated columns; None when a field fails validation"""
+    fed_id_start, sub_object_start, dollar_end = offsets
+    
+    if len(line) < dollar_end:
+        return None
+    
+    fed_id = line[fed_id_start:fed_id_start + 9]
+    sub_object = line[sub_object_start:sub_object_start + 2]
+    if not (fed_id.isdecimal()
+            and not line[fed_id_start + 9:sub_object_start].strip()
+            and _is_sub_object(sub_object)):
+        return None
+    
+    # Anything after the dollar column may only be the fiscal year
+    tail = line[dollar_end:]
+    if tail[:1].isdecimal() or (tail.strip() and not tail.strip().isdecimal()):
+        return None
+    
+    amount = line[sub_object_start + 2:dollar_end].strip()
+    if amount[-3:-2] == '.' and amount[:-3].isdecimal() and amount[-2:].isdecimal():
+        dollar_amount = amount
+    elif len(amount) >= 5 and amount.isdecimal():
+        dollar_amount = f"{amount[:-2]}.{amount[-2:]}"
+    else:
+        return None
+    
+    # A Fed ID-shaped run inside the firm name columns is the one the regex
+    # parser takes, so leave such lines to it. Such a run (and its sub-object)
+    # lies wholly in those columns, and only a firm name with a digit can hold it
+    if (_DIGIT.search(line, 5, fed_id_start)
+            and _FED_ID_LA.search(line, 5, fed_id_start)):
+        return None
+    
+    return (
+        line[0],
+        line[1:5],
+        line[5:fed_id_start].strip(),
+        fed_id,
+        sub_object,
+        dollar_amount,
+        line[-4:-2] if line[-4:].isdecimal() else "",
+        "13"
+    )
 
 def convert_single_file(input_file_path, output_file_path):
     """Convert a single fixed-width file to CSV format"""
@@ -100,28 +220,46 @@ def convert_single_file(input_file_path, output_file_path):
                'Sub-object', 'Dollar Amount', 'Fiscal Year', 'Fiscal Month']
     
     try:
-        with open(input_file_path, 'r', encoding='utf-8') as infile:
+        with open(input_file_path, 'r', encoding='utf-8', buffering=READ_BUFFER_BYTES) as infile:
             with open(output_file_path, 'w', newline='', encoding='utf-8') as outfile:
-                writer = csv.DictWriter(outfile, fieldnames=headers)
-                writer.writeheader()
+                writer = csv.writer(outfile)
+                writer.writerow(headers)
+                batch = []
                 
                 line_count = 0
                 processed_count = 0
                 
-                for line in infile:
+                # Slice at columns learned from the first lines; the regex
+                # parser handles anything that does not fit that layout
+                head = list(islice(infile, CALIBRATION_LINES))
+                offsets = calibrate_offsets(head)
+                
+                for line in chain(head, infile):
                     line_count += 1
-                    parsed_data = parse_fixed_width_line(line)
+                    line = line.strip()
+                    if not line:
+                        continue
+                    
+                    parsed_data = _parse_fast(line, offsets) if offsets else None
+                    if parsed_data is None:
+                        parsed_data = parse_fixed_width_line(line)
                     
                     if parsed_data:
-                        writer.writerow(parsed_data)
+                        batch.append(parsed_data)
                         processed_count += 1
-                    elif line.strip():
-                        print(f"  Warning: Could not parse line {line_count}")
+                        if len(batch) >= WRITE_BATCH_ROWS:
+                            writer.writerows(batch)
+                            batch.clear()
+                    else:
+                        print(f"  Warning: Could not parse line {line_count} "
+                              f"in {os.path.basename(input_file_path)}")
+                
+                writer.writerows(batch)
                 
                 return processed_count, line_count
     
     except Exception as e:
-        print(f"  Error processing file: {e}")
+        print(f"  Error processing file {os.path.basename(input_file_path)}: {e}")
         return 0, 0
 
 def process_folder():
@@ -139,43 +277,57 @@ def process_folder():
     else:
         output_dir = input_folder_path
     
-    # Find all matching files
-    input_folder = Path(input_folder_path)
-    matching_files = list(input_folder.glob(file_pattern))
+    # Find all matching files (scandir returns names and file types in one read;
+    # a pattern of None means every .txt file)
+    pattern = file_pattern or "*.txt"
+    with os.scandir(input_folder_path) as entries:
+        matching_files = [
+            entry for entry in entries
+            if entry.is_file() and fnmatch.fnmatch(entry.name, pattern)
+        ]
+    
+    # Largest files first so a big file never starts last and holds up the batch
+    matching_files.sort(key=lambda entry: entry.stat().st_size, reverse=True)
     
     if not matching_files:
-        print(f"No files found matching pattern '{file_pattern}' in {input_folder_path}")
+        print(f"No files found matching pattern '{pattern}' in {input_folder_path}")
         return
     
     print(f"Found {len(matching_files)} files to process:")
     for file in matching_files:
         print(f"  - {file.name}")
     
-    print("\nProcessing files...")
+    workers = min(len(matching_files), max_workers or os.cpu_count() or 1)
+    print(f"\nProcessing files with {workers} worker(s)...")
     print("=" * 50)
     
     total_files_processed = 0
     total_lines_processed = 0
     total_lines_found = 0
     
-    for input_file in matching_files:
-        # Generate output filename
-        output_filename = input_file.stem + "_converted.csv"
-        output_file_path = os.path.join(output_dir, output_filename)
+    # Each file is independent, so convert them in separate processes
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for entry in matching_files:
+            output_filename = os.path.splitext(entry.name)[0] + "_converted.csv"
+            future = executor.submit(convert_single_file, entry.path,
+                                     os.path.join(output_dir, output_filename))
+            futures[future] = (entry.name, output_filename)
         
-        print(f"\nProcessing: {input_file.name}")
-        print(f"Output: {output_filename}")
-        
-        # Convert the file
-        processed_lines, total_lines = convert_single_file(str(input_file), output_file_path)
-        
-        if processed_lines > 0:
-            print(f"  ✅ Success: {processed_lines}/{total_lines} lines processed")
-            total_files_processed += 1
-            total_lines_processed += processed_lines
-            total_lines_found += total_lines
-        else:
-            print(f"  ❌ Failed to process file")
+        for future in as_completed(futures):
+            file_name, output_filename = futures[future]
+            processed_lines, total_lines = future.result()
+            
+            print(f"\nFinished: {file_name}")
+            print(f"Output: {output_filename}")
+            
+            if processed_lines > 0:
+                print(f"  ✅ Success: {processed_lines}/{total_lines} lines processed")
+                total_files_processed += 1
+                total_lines_processed += processed_lines
+                total_lines_found += total_lines
+            else:
+                print(f"  ❌ Failed to process file")
     
     print("\n" + "=" * 50)
     print("BATCH PROCESSING COMPLETE!")